@@ -1,3 +1,7 @@
+import numpy as np
+from online_stats import QUEUE_NAMES
+
+
 # calculating kpi's
 # calculate total patients situation
 def calculate_kpis(patients):
@@ -113,6 +117,46 @@ def calculate_queue_length_stats(event_log, simulation_time, queue_name):
     return average_queue_length, max_queue_length
 
 
+def calculate_all_queue_stats(event_log, simulation_time, queue_names=QUEUE_NAMES):
+    """
+    Single-pass version of calculate_queue_length_stats for all queues at once, plus
+    calculate_emergency_queue_full_probability.
+
+    The log is walked once to collect event times and queue lengths into NumPy arrays;
+    the time integration is then vectorized.
+
+    Args:
+        event_log (list): List of events with time and queue length information.
+        simulation_time (float): Total simulation time.
+        queue_names (list): Queue keys of the state snapshots (default: all seven queues).
+
+    Returns:
+        dict: queue name -> (average_queue_length, max_queue_length), and
+            'emergency_queue_full_probability' -> float.
+    """
+    n_events = len(event_log)
+    times = np.empty(n_events)
+    lengths = np.empty((n_events, len(queue_names)), dtype=np.int64)
+    emergency_queue_full = np.empty(n_events, dtype=bool)
+    for i, event in enumerate(event_log):
+        snapshot = event["state_snapshot"]
+        times[i] = event["time"]
+        lengths[i] = [len(snapshot[queue_name]) for queue_name in queue_names]
+        emergency_queue_full[i] = snapshot["emergency_queue"] >= snapshot["emergency_queue_capacity"]
+
+    # The state after event i holds until event i + 1; the state after the last event is not counted
+    elapsed_time = np.diff(times)
+    areas = elapsed_time @ lengths[:-1] if n_events > 1 else np.zeros(len(queue_names))
+    maxima = lengths[:-1].max(axis=0) if n_events > 1 else np.zeros(len(queue_names), dtype=np.int64)
+
+    stats = {}
+    for j, queue_name in enumerate(queue_names):
+        average_queue_length = areas[j] / simulation_time if simulation_time > 0 else 0
+        stats[queue_name] = (average_queue_length, int(maxima[j]))
+    stats["emergency_queue_full_probability"] = elapsed_time[emergency_queue_full[:-1]].sum() / simulation_time
+    return stats
+
+
 # calculate waiting time for lab and other sections
 def calculate_waiting_times(patients):
     total_waiting_time = 0
@@ -358,7 +402,7 @@ def calculate_ward_waiting_times(patients):
     print(f'Maximum Wait Time   : {max_wait:>12.4f}')'''
 
 
-def calculate_section_metrics(event_log, simulation_time, patients, section_name):
+def calculate_section_metrics(event_log, simulation_time, patients, section_name, collector=None):
     """
     Print metrics for a given hospital section
 
@@ -367,6 +411,7 @@ def calculate_section_metrics(event_log, simulation_time, patients, section_name
         simulation_time: Total simulation time
         patients: Dictionary of patient objects
         section_name: Name of the section (lab, pre_surgery, surgery, icu, ward, ccu)
+        collector: Optional StatisticsCollector; queue stats are read from it instead of the event log
     """
     # Map section names to their queue list names and waiting time calculation functions
     waiting_time_functions = {
@@ -380,7 +425,10 @@ def calculate_section_metrics(event_log, simulation_time, patients, section_name
 
     # Calculate queue length statistics
     queue_name = f"{section_name}_list"
-    avg_queue, max_queue = calculate_queue_length_stats(event_log, simulation_time, queue_name)
+    if collector is not None:
+        avg_queue, max_queue = collector.queue_length_stats(simulation_time, queue_name)
+    else:
+        avg_queue, max_queue = calculate_all_queue_stats(event_log, simulation_time, [queue_name])[queue_name]
 
     # Calculate waiting times
     waiting_func = waiting_time_functions[section_name]
@@ -0,0 +1,71 @@
+"""
+Benchmark of the future event list backends (binary heap vs calendar queue).
+
+1. Classic "hold" model: the FEL is pre-filled with N pending events, then each
+   hold pops the earliest event and schedules a new one an exponential time
+   later (mean 50 hours, like ward stays), so the pending set stays at N.
+2. A full hospital simulation run with each backend on the same seed (no event
+   log, so the timing is not dominated by state copies), then a second, traced
+   run checking that both process exactly the same event sequence.
+
+Usage:
+    python benchmark_fel.py
+"""
+
+import random
+import time
+
+from context import SimulationContext
+from events import EventType
+from fel import make_future_event_list
+from simulation import simulation
+from tracing import Tracer, EVENTS
+from utils import set_seed
+
+BACKENDS = ['heap', 'calendar']
+WARD_MEAN_STAY = 50 * 60  # minutes
+
+
+def hold_benchmark(backend, n_pending, n_holds, seed=776):
+    """Time n_holds hold operations on a FEL holding n_pending events."""
+    rng = random.Random(seed)
+    future_event_list = make_future_event_list(backend)
+    for _ in range(n_pending):
+        future_event_list.push(rng.expovariate(1 / WARD_MEAN_STAY), EventType.WARD_DONE)
+
+    start = time.perf_counter()
+    for _ in range(n_holds):
+        event_time, _, code, patient_id = future_event_list.pop()
+        future_event_list.push(event_time + rng.expovariate(1 / WARD_MEAN_STAY), code, patient_id)
+    return time.perf_counter() - start
+
+
+def simulation_benchmark(backend, simulation_time, seed=776):
+    """Run the hospital simulation with the given backend, returning (elapsed, event sequence)."""
+    set_seed(seed)
+    start = time.perf_counter()
+    simulation(simulation_time, log_mode='none', context=SimulationContext(fel_backend=backend))
+    elapsed = time.perf_counter() - start
+
+    # Same run again with an event trace, outside the timing
+    set_seed(seed)
+    tracer = Tracer(EVENTS)
+    simulation(simulation_time, log_mode='none', context=SimulationContext(fel_backend=backend, trace=tracer))
+    return elapsed, [(record['time'], record['event_type']) for record in tracer.records if record['kind'] == 'event']
+
+
+if __name__ == "__main__":
+    n_holds = 200000
+    print(f"Hold model ({n_holds} holds, exponential increments, mean {WARD_MEAN_STAY} min)")
+    print(f"{'pending':>10} " + " ".join(f"{backend:>12}" for backend in BACKENDS))
+    for n_pending in [100, 1000, 10000, 100000]:
+        timings = [hold_benchmark(backend, n_pending, n_holds) for backend in BACKENDS]
+        print(f"{n_pending:>10} " + " ".join(f"{t:>11.3f}s" for t in timings))
+
+    simulation_time = 60 * 24 * 5
+    print(f"\nHospital simulation ({simulation_time / (60 * 24):.0f} days, seed 776)")
+    results = {backend: simulation_benchmark(backend, simulation_time) for backend in BACKENDS}
+    for backend, (elapsed, events) in results.items():
+        print(f"{backend:>10} : {elapsed:.3f}s for {len(events)} events")
+    identical = results['heap'][1] == results['calendar'][1]
+    print(f"Identical event sequence: {identical}")
@@ -0,0 +1,113 @@
+"""
+Checkpoints of a running simulation, for warm starts.
+
+A checkpoint is the pickled mid-run content of a SimulationContext: the state
+dict, the pending future event list, the patients and the random number
+streams (with their positions). restore_checkpoint() turns it back into a
+context that simulation() continues from the checkpoint time, so replications
+can skip the fill-up of the empty hospital:
+
+    checkpoint = warm_up(warmup_time, seed=1, substreams=True)   # once
+    for seed in seeds:                                            # many times
+        context = restore_checkpoint(checkpoint, seed=seed, collector=StatisticsCollector())
+        simulation(warmup_time + run_length, log_mode='none', context=context)
+
+Restored with a seed, every stream is replaced by a fresh one, so the runs share
+the warmed-up system but not their future; without a seed the saved streams
+continue exactly where the checkpoint left them.
+"""
+
+import pickle
+import random
+
+from context import SimulationContext
+from simulation import simulation
+from utils import DEFAULT_VARIATES
+
+
+def save_checkpoint(context):
+    """
+    Serialize the current content of a context.
+
+    All patients are kept (not only the ones still in the system): new patient ids are
+    len(patients) + 1, and a PatientStore indexes its rows by id. Patient KPIs of a warm-started
+    run should only count patients arriving after the checkpoint time.
+
+    Args:
+        context (SimulationContext): Context of a run (after simulation() returned).
+    Returns:
+        bytes: The checkpoint.
+    """
+    uses_global_random = any(source is DEFAULT_VARIATES for source in [context.rng, *context.streams.values()])
+    return pickle.dumps({
+        "time": context.time,
+        "state": context.state,
+        "future_event_list": context.future_event_list,
+        "patients": context.patients,
+        "rng": context.rng,
+        "streams": context.streams,
+        # DEFAULT_VARIATES draws from the global random module, whose position is saved separately
+        "random_state": random.getstate() if uses_global_random else None,
+        "substreams": context.substreams,
+        "rng_backend": context.rng_backend,
+        "fel_backend": context.fel_backend,
+        "capacities": context.capacities,
+        "outage_capacities": context.outage_capacities,
+        "surgery_durations": context.surgery_durations,
+    }, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def restore_checkpoint(checkpoint, seed=None, rng_backend=None, collector=None, trace=None):
+    """
+    Create a context that continues the run saved in a checkpoint.
+
+    Every call unpickles its own copy, so one checkpoint can start any number of runs.
+
+    Args:
+        checkpoint (bytes): Output of save_checkpoint.
+        seed (int): Seed of fresh random number streams for the rest of the run (substreams if the
+            checkpointed run had them). None continues the saved streams; this also restores the
+            position of the global random module if the run drew from it.
+        rng_backend (str): Backend of the fresh streams ('python' or 'numpy'), when `seed` is given
+            (default: the backend of the checkpointed run).
+        collector (StatisticsCollector): Optional online statistics of the rest of the run. It is started
+            from the restored state at the checkpoint time, so its time averages cover the time after
+            the checkpoint: divide by the run length after it.
+        trace (Tracer): Trace of the rest of the run.
+    Returns:
+        SimulationContext: Context to pass to simulation(); simulation_time stays absolute.
+    """
+    saved = pickle.loads(checkpoint)
+    options = dict(fel_backend=saved["fel_backend"], collector=collector, trace=trace,
+                   capacities=saved["capacities"], outage_capacities=saved["outage_capacities"],
+                   surgery_durations=saved["surgery_durations"])
+    context = SimulationContext(rng=saved["rng"], **options)
+    context.streams = saved["streams"]
+    context.substreams = saved["substreams"]
+    context.rng_backend = saved["rng_backend"]
+    if seed is not None:
+        context.reseed(seed, rng_backend)
+    elif saved["random_state"] is not None:
+        random.setstate(saved["random_state"])
+    context.patients = saved["patients"]
+    context.state = saved["state"]
+    context.future_event_list = saved["future_event_list"]
+    context.time = saved["time"]
+    if collector is not None:
+        collector.start(context.time, context.state)
+    return context
+
+
+def warm_up(warmup_time, **context_options):
+    """
+    Run the hospital from the empty starting state until `warmup_time` and checkpoint it.
+    Args:
+        warmup_time (float): Length of the warm-up (minutes).
+        **context_options: Options of the SimulationContext of the warm-up run (seed, substreams,
+            capacities...).
+    Returns:
+        bytes: Checkpoint of the warmed-up system (see save_checkpoint).
+    """
+    context = SimulationContext(**context_options)
+    simulation(warmup_time, log_mode='none', context=context, pause=True)
+    return save_checkpoint(context)
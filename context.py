@@ -0,0 +1,183 @@
+"""
+Per-run context of the hospital simulation.
+
+A SimulationContext owns everything one run mutates: the state dict, the
+future event list, the patients, the random number streams and the
+statistics collector. The event handlers in simulation.py receive the context
+instead of reading module globals, so independent runs can share a process
+(one after the other, in threads or in long-lived worker processes).
+"""
+
+import random
+
+import numpy as np
+from models import PatientStore
+from tracing import Tracer
+from utils import (generate_simple_duration, generate_medium_duration, generate_complex_duration,
+                   DEFAULT_VARIATES, RandomVariates, NumpyVariates)
+
+PATIENT_STORES = ('dict', 'columnar')
+RNG_BACKENDS = ('python', 'numpy')
+
+# Stochastic processes with their own random number stream (see SimulationContext.streams).
+# Substreams are spawned in this order, so only append new names: a stream keeps its numbers
+# as long as its position does not change.
+STREAM_NAMES = (
+    "arrivals",          # interarrival times and emergency/elective class
+    "group_size",        # emergency group arrivals and their size
+    "lab_service",       # lab service times
+    "er_stay",           # time in the emergency room
+    "surgery_type",      # operation type
+    "surgery_duration",  # operation durations
+    "routing",           # where patients go after surgery, ICU and CCU (including deaths)
+    "los",               # length of stay in the ward, ICU and CCU
+    "power",             # power outages
+)
+
+DEFAULT_CAPACITIES = {
+    "emergency_queue_capacity": 10,
+    "pre_surgery_capacity": 25,
+    "emergency_capacity": 10,
+    "lab_capacity": 3,
+    "ward_capacity": 40,
+    "icu_capacity": 10,
+    "ccu_capacity": 5,
+    "operating_room_capacity": 50,
+}
+
+# Capacities while the power is out (see power_out / power_restore)
+OUTAGE_CAPACITIES = {
+    "icu_capacity": 8,
+    "ccu_capacity": 4,
+}
+
+DEFAULT_SURGERY_DURATIONS = {
+    "simple": generate_simple_duration,
+    "medium": generate_medium_duration,
+    "complex": generate_complex_duration,
+}
+
+
+class SimulationContext:
+    """
+    Everything a single simulation run owns.
+
+    Attributes:
+        state (dict): Current state of the hospital (set by starting_state).
+        future_event_list (FutureEventList or CalendarQueue): Pending events (set by starting_state).
+        patients (dict or PatientStore): Patients of the run, by id.
+        rng (RandomVariates or NumpyVariates): Variate source of the run (random(), exponential(),
+            normal(), triangular(), discrete_uniform(), uniform()).
+        streams (dict): Stream name (STREAM_NAMES) -> variate source the handlers draw that process from.
+            Every name maps to `rng` unless the context was created with substreams=True.
+        collector (StatisticsCollector): Optional online statistics, updated after every event.
+        trace (Tracer): Structured trace of the run (disabled by default).
+        capacities (dict): Bed capacities at the start of the run (and after a power outage).
+        outage_capacities (dict): Capacities that change while the power is out.
+        surgery_durations (dict): Operation type -> sampler called as sampler(rng) (see utils).
+        substreams (bool): Whether every stream is an independent substream.
+        rng_backend (str): Backend of the streams, 'python' or 'numpy' (reseed keeps it by default).
+        time (float): Time of the last processed event (0 before the run).
+
+    A context describes one run: create a new one for every replication.
+    """
+
+    def __init__(self, fel_backend='heap', patient_store='dict', collector=None, seed=None, rng=None,
+                 capacities=None, outage_capacities=None, surgery_durations=None, trace=None, rng_backend='python',
+                 substreams=False):
+        """
+        Args:
+            fel_backend (str): Future event list implementation, 'heap' or 'calendar'.
+            patient_store (str): 'dict' (Patient objects) or 'columnar' (NumPy-backed PatientStore).
+            collector (StatisticsCollector): Optional online statistics.
+            seed (int): Seed of a private variate source for this run. Required for runs in threads.
+                Without a seed, 'python' draws from the global random module and 'numpy' is seeded from
+                the global NumPy state, so both follow utils.set_seed.
+            rng (RandomVariates or NumpyVariates): Explicit variate source (overrides `seed` and `rng_backend`).
+            capacities (dict): Overrides of DEFAULT_CAPACITIES.
+            outage_capacities (dict): Overrides of OUTAGE_CAPACITIES.
+            surgery_durations (dict): Overrides of DEFAULT_SURGERY_DURATIONS.
+            trace (Tracer): Trace of the run; a disabled Tracer when omitted.
+            rng_backend (str): 'python' draws with the original samplers from random.Random (same numbers
+                as before); 'numpy' serves variates from blocks drawn with a numpy Generator (faster).
+            substreams (bool): Give every stochastic process its own stream, spawned from
+                numpy.random.SeedSequence(seed). Draws added to one process then leave the numbers of
+                the others unchanged, so replications stay comparable across code changes and
+                configurations (common random numbers).
+        """
+        if patient_store == 'columnar':
+            self.patients = PatientStore()
+        elif patient_store == 'dict':
+            self.patients = {}
+        else:
+            raise ValueError(f"Unknown patient_store {patient_store!r}, expected one of {PATIENT_STORES}")
+        if rng is None:
+            rng = _make_variates(rng_backend, seed)
+        elif substreams:
+            raise ValueError("substreams are spawned from `seed`, they cannot be combined with `rng`")
+        else:
+            rng_backend = 'numpy' if isinstance(rng, NumpyVariates) else 'python'
+        self.rng = rng
+        if substreams:
+            self.streams = _make_streams(rng_backend, seed)
+        else:
+            self.streams = dict.fromkeys(STREAM_NAMES, rng)
+        self.fel_backend = fel_backend
+        self.collector = collector
+        self.trace = trace if trace is not None else Tracer()
+        self.capacities = _with_overrides(DEFAULT_CAPACITIES, capacities, "capacity")
+        self.outage_capacities = _with_overrides(OUTAGE_CAPACITIES, outage_capacities, "outage capacity")
+        self.surgery_durations = _with_overrides(DEFAULT_SURGERY_DURATIONS, surgery_durations, "operation type")
+        self.substreams = substreams
+        self.rng_backend = rng_backend
+        self.state = None
+        self.future_event_list = None
+        self.time = 0
+
+    def reseed(self, seed, rng_backend=None):
+        """
+        Replace the random number streams with fresh ones, e.g. to branch runs from one warmed-up context.
+        Args:
+            seed (int): Seed of the new streams (substreams if the context has them).
+            rng_backend (str): 'python' or 'numpy', as in the constructor (default: the current backend).
+        """
+        if rng_backend is not None:
+            self.rng_backend = rng_backend
+        rng_backend = self.rng_backend
+        self.rng = _make_variates(rng_backend, seed)
+        self.streams = _make_streams(rng_backend, seed) if self.substreams else dict.fromkeys(STREAM_NAMES, self.rng)
+
+
+def _make_variates(rng_backend, seed):
+    """Create the variate source of a run."""
+    if rng_backend == 'python':
+        return RandomVariates(random.Random(seed)) if seed is not None else DEFAULT_VARIATES
+    if rng_backend == 'numpy':
+        if seed is None:
+            seed = int(np.random.randint(2 ** 32, dtype=np.uint64))
+        return NumpyVariates(seed)
+    raise ValueError(f"Unknown rng_backend {rng_backend!r}, expected one of {RNG_BACKENDS}")
+
+
+def _make_streams(rng_backend, seed):
+    """Create one independent variate source per stream name, spawned from SeedSequence(seed)."""
+    if seed is None:
+        seed = int(np.random.randint(2 ** 32, dtype=np.uint64))
+    children = np.random.SeedSequence(seed).spawn(len(STREAM_NAMES))
+    if rng_backend == 'python':
+        sources = [RandomVariates(random.Random(child.generate_state(4).tobytes())) for child in children]
+    elif rng_backend == 'numpy':
+        sources = [NumpyVariates(child) for child in children]
+    else:
+        raise ValueError(f"Unknown rng_backend {rng_backend!r}, expected one of {RNG_BACKENDS}")
+    return dict(zip(STREAM_NAMES, sources))
+
+
+def _with_overrides(defaults, overrides, kind):
+    """Return a copy of `defaults` updated with `overrides`, rejecting unknown keys."""
+    values = dict(defaults)
+    for key, value in (overrides or {}).items():
+        if key not in defaults:
+            raise ValueError(f"Unknown {kind} {key!r}, expected one of {sorted(defaults)}")
+        values[key] = value
+    return values
@@ -0,0 +1,110 @@
+"""
+Control variates for replication KPIs.
+
+Some random inputs of a run have a known expectation: interarrival and
+length-of-stay times divided by their mean average 1, and surgery durations
+standardized with their normal parameters average 0. A ControlRecorder wraps a
+variate stream of the context and records these standardized draws, so every
+replication reports how "lucky" its inputs were. KPI estimates are then
+corrected for that luck by regressing them on the controls.
+
+The known means hold for every single draw. A run averages over a random number
+of draws, which depends on when it stops, so the mean of a control is only
+approximately unbiased (the bias shrinks with the number of draws).
+"""
+
+import numpy as np
+
+# Control name -> (stream name in SimulationContext.streams, known mean of the recorded values)
+CONTROLS = {
+    "control_arrivals": ("arrivals", 1.0),                  # interarrival time * rate
+    "control_surgery_duration": ("surgery_duration", 0.0),  # (duration - mean) / std_dev
+    "control_los": ("los", 1.0),                            # length of stay * rate
+}
+
+
+class ControlRecorder:
+    """
+    Variate source that passes draws through from `source` and keeps the running sum of the
+    standardized exponential and normal draws. Other methods go straight to `source`.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.total = 0.0
+        self.count = 0
+
+    def exponential(self, lambd):
+        value = self.source.exponential(lambd)
+        self.total += value * lambd
+        self.count += 1
+        return value
+
+    def normal(self, mean, std_dev):
+        value = self.source.normal(mean, std_dev)
+        self.total += (value - mean) / std_dev
+        self.count += 1
+        return value
+
+    def mean(self):
+        """Mean of the standardized draws (nan when nothing was drawn)."""
+        return self.total / self.count if self.count else float('nan')
+
+    def __getattr__(self, name):
+        # Only called for attributes missing on the recorder. While unpickling or copying, `source`
+        # itself is not set yet: looking it up here again would recurse forever.
+        if name == 'source' or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.source, name)
+
+
+def attach_control_recorders(context):
+    """
+    Wrap the streams of `context` that feed the controls in ControlRecorders.
+    Args:
+        context (SimulationContext): Context of the run, before simulation() is called.
+    Returns:
+        dict: Control name -> ControlRecorder; read them with control_values() after the run.
+    """
+    recorders = {}
+    for control_name, (stream_name, _) in CONTROLS.items():
+        recorders[control_name] = ControlRecorder(context.streams[stream_name])
+        context.streams[stream_name] = recorders[control_name]
+    return recorders
+
+
+def control_values(recorders):
+    """Return the realized value of every control (control name -> mean of its standardized draws)."""
+    return {control_name: recorder.mean() for control_name, recorder in recorders.items()}
+
+
+def control_variate_estimate(data, controls):
+    """
+    Control-variate estimate of the mean of `data` and its standard error.
+
+    Fits data_i = b0 + b' (c_i - mu) by least squares; b0 is the estimate. The standard error
+    uses the residual variance with n - q - 1 degrees of freedom for q controls.
+
+    Args:
+        data (list): KPI values, one per replication.
+        controls (dict): Control name -> list of realized control values, one per replication
+            (names from CONTROLS, which gives their known means).
+    Returns:
+        tuple: (estimate, standard error); the plain sample mean and its standard error when
+            there are too few replications to fit the controls.
+    """
+    y = np.asarray(data, dtype=float)
+    n = len(y)
+    columns = [np.asarray(values, dtype=float) - CONTROLS[name][1] for name, values in controls.items()]
+    # Controls that did not vary (or were never drawn) carry no information
+    columns = [column for column in columns if np.all(np.isfinite(column)) and np.ptp(column) > 0]
+    q = len(columns)
+    if n - q - 1 < 1:
+        return np.mean(y), np.std(y, ddof=1) / np.sqrt(n) if n > 1 else float('nan')
+
+    x = np.column_stack([np.ones(n)] + columns)
+    coefficients, _, _, _ = np.linalg.lstsq(x, y, rcond=None)
+    residuals = y - x @ coefficients
+    residual_variance = residuals @ residuals / (n - q - 1)
+    standard_error = np.sqrt(residual_variance * np.linalg.pinv(x.T @ x)[0, 0])
+    return coefficients[0], standard_error
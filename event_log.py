@@ -0,0 +1,212 @@
+"""
+Delta-encoded event log for the hospital simulation.
+
+Instead of a deep copy of the whole state and FEL after every event, only the
+state keys that changed are stored, plus a full keyframe every few events.
+Entries are rebuilt on demand, so the log can be used wherever the list of
+event dicts produced by simulation(log_mode='full') is expected.
+"""
+
+import heapq
+
+from events import EVENT_NAMES, event_dict
+from queues import QUEUE_TYPES
+
+
+class LoggedEvent(dict):
+    """
+    Event dict returned by DeltaEventLog.
+
+    The 'future_event_list' key is only rebuilt when it is actually read.
+    """
+
+    def __init__(self, event_log, step, *args):
+        super().__init__(*args)
+        self._event_log = event_log
+        self._step = step
+
+    def __missing__(self, key):
+        if key != 'future_event_list':
+            raise KeyError(key)
+        value = self._event_log.future_event_list_at(self._step)
+        self[key] = value
+        return value
+
+
+def _list_delta(previous, current):
+    """
+    Encode the change of a queue as (removed_from_front, appended) or None if it
+    is not a pure "pop from the front / append at the end" change.
+    """
+    if not current:
+        return len(previous), []
+    try:
+        removed = previous.index(current[0]) if previous else 0
+    except ValueError:
+        removed = len(previous)
+    kept = len(previous) - removed
+    if current[:kept] != previous[removed:]:
+        return None
+    return removed, current[kept:]
+
+
+class DeltaEventLog:
+    """
+    Event log that stores per-event state deltas and periodic full keyframes.
+
+    Behaves like the list of event dicts built by simulation(log_mode='full'):
+    it supports len(), indexing and iteration, and every entry has the keys
+    "time", "event_type", "patient", "state_snapshot" and "future_event_list".
+    Sequential access (as in the functions of analysis.py) costs O(1) per
+    step; random access replays at most `keyframe_interval` deltas.
+
+    Unlike the full log, patients are not deep-copied: entries reference the
+    live Patient objects, so patient attributes show their final values.
+    `patients` (the run's patients) resolves the patient ids of pending events.
+    """
+
+    def __init__(self, keyframe_interval=100, patients=None):
+        self.keyframe_interval = keyframe_interval
+        self.patients = patients
+        self._times = []
+        self._event_codes = []
+        self._patients = []
+        self._deltas = []  # changed scalar keys -> value, queue keys -> (removed, appended) or full list
+        self._pushed = []  # (time, seq, code, patient_id) FEL entries pushed while processing each event
+        self._keyframes = {}  # step -> (state copy, FEL entries)
+        self._previous = None
+        self._list_keys = ()
+        self._queue_versions = {}  # queue key -> (id, version) of the queue when last compared
+        self._cursor = None  # (step, state) of the last rebuilt entry
+        self._fel_cursor = None  # (step, FEL heap) of the last rebuilt FEL
+
+    def append(self, time, code, patient, state, future_event_list):
+        """
+        Log the state right after an event.
+        Args:
+            time (float): Time of the event.
+            code (int): Event type code (see events.py).
+            patient (Patient): Patient of the event (or None).
+            state (dict): Current state of the hospital.
+            future_event_list: FEL with `journal` set to a list (see fel.py).
+        """
+        step = len(self._times)
+        self._times.append(time)
+        self._event_codes.append(code)
+        self._patients.append(patient)
+        self._pushed.append(tuple(future_event_list.journal))
+        future_event_list.journal.clear()
+
+        previous = self._previous
+        if previous is None:
+            self._list_keys = tuple(key for key, value in state.items() if isinstance(value, (list,) + QUEUE_TYPES))
+            self._previous = previous = {key: (list(value) if key in self._list_keys else value)
+                                         for key, value in state.items()}
+            delta = {}
+        else:
+            delta = {}
+            list_keys = self._list_keys
+            queue_versions = self._queue_versions
+            for key, value in state.items():
+                if key in list_keys:
+                    version = getattr(value, 'version', None)
+                    if version is not None:
+                        # Queues count their changes: skip the comparison when nothing happened
+                        if queue_versions.get(key) == (id(value), version):
+                            continue
+                        queue_versions[key] = (id(value), version)
+                    current = list(value)
+                    if current != previous[key]:
+                        encoded = _list_delta(previous[key], current)
+                        delta[key] = current if encoded is None else encoded
+                        previous[key] = current
+                elif value != previous[key]:
+                    delta[key] = value
+                    previous[key] = value
+        self._deltas.append(delta)
+
+        if step % self.keyframe_interval == 0:
+            self._keyframes[step] = ({key: (list(value) if key in self._list_keys else value)
+                                      for key, value in previous.items()},
+                                     future_event_list.entries())
+
+    def _apply(self, state, delta):
+        """Return a new state dict with `delta` applied to `state`."""
+        state = dict(state)
+        for key, value in delta.items():
+            if key not in self._list_keys:
+                state[key] = value
+            elif isinstance(value, tuple):
+                removed, appended = value
+                state[key] = state[key][removed:] + appended
+            else:
+                state[key] = list(value)
+        return state
+
+    def state_at(self, step):
+        """
+        Rebuild the state snapshot right after event number `step`.
+        Returns:
+            dict: State dictionary (queues are fresh lists, safe to keep).
+        """
+        if step < 0:
+            step += len(self._times)
+        if not 0 <= step < len(self._times):
+            raise IndexError("event log index out of range")
+        cursor = self._cursor
+        if cursor is not None and cursor[0] == step:
+            return cursor[1]
+
+        keyframe_step = step - step % self.keyframe_interval
+        if cursor is not None and keyframe_step <= cursor[0] < step:
+            start, state = cursor
+        else:
+            start = keyframe_step
+            keyframe_state = self._keyframes[keyframe_step][0]
+            state = {key: (list(value) if key in self._list_keys else value) for key, value in keyframe_state.items()}
+        for i in range(start + 1, step + 1):
+            state = self._apply(state, self._deltas[i])
+        self._cursor = (step, state)
+        return state
+
+    def future_event_list_at(self, step):
+        """
+        Rebuild the pending events right after event number `step`.
+        Returns:
+            list: Pending event dicts in processing order.
+        """
+        if step < 0:
+            step += len(self._times)
+        keyframe_step = step - step % self.keyframe_interval
+        cursor = self._fel_cursor
+        if cursor is not None and keyframe_step <= cursor[0] <= step:
+            start, heap = cursor[0], list(cursor[1])
+        else:
+            start, heap = keyframe_step, list(self._keyframes[keyframe_step][1])
+            heapq.heapify(heap)
+        for i in range(start + 1, step + 1):
+            heapq.heappop(heap)  # the event processed at step i
+            for entry in self._pushed[i]:
+                heapq.heappush(heap, entry)
+        self._fel_cursor = (step, heap)
+        return [event_dict(entry, self.patients) for entry in sorted(heap)]
+
+    def __len__(self):
+        return len(self._times)
+
+    def __getitem__(self, step):
+        if isinstance(step, slice):
+            return [self[i] for i in range(*step.indices(len(self)))]
+        if step < 0:
+            step += len(self._times)
+        state = self.state_at(step)
+        return LoggedEvent(self, step, {
+            "time": self._times[step],
+            "event_type": EVENT_NAMES[self._event_codes[step]],
+            "patient": self._patients[step],
+            "state_snapshot": state,
+        })
+
+    def __iter__(self):
+        for step in range(len(self._times)):
+            yield self[step]
@@ -0,0 +1,68 @@
+"""
+Event types of the hospital simulation.
+
+Events are identified by small integer codes. The future event list stores
+compact (time, seq, code, patient_id) tuples, and simulation() routes each
+event through EVENT_HANDLERS[code]. New event types can be added with
+register_event_type() without touching the simulation loop.
+"""
+
+from enum import IntEnum
+
+
+class EventType(IntEnum):
+    """Codes of the built-in event types (handlers are registered by simulation.py)."""
+    NEW_ARRIVAL = 0
+    LAB_FREE = 1
+    EMERGENCY_DONE = 2
+    PRE_SURGERY_DONE = 3
+    SURGERY_DONE = 4
+    SURGERY_FREE = 5
+    ICU_DONE = 6
+    CCU_DONE = 7
+    WARD_DONE = 8
+    POWER_OUT = 9
+    POWER_RESTORE = 10
+
+
+EVENT_NAMES = [event_type.name.lower() for event_type in EventType]  # code -> name ('new_arrival', ...)
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_NAMES)}  # name -> code
+EVENT_HANDLERS = [None] * len(EVENT_NAMES)  # code -> handler(context, current_time, patient)
+
+
+def register_event_type(name, handler):
+    """
+    Register the handler of an event type, adding the type if it is new.
+    Args:
+        name (str): Event type name, as shown in event logs (e.g. 'shift_change').
+        handler (callable): Called as handler(context, current_time, patient) for every event of this
+            type; patient is None for events scheduled without a patient.
+    Returns:
+        int: Code of the event type, to pass to fel_maker / FutureEventList.push.
+    """
+    code = EVENT_CODES.get(name)
+    if code is None:
+        code = len(EVENT_NAMES)
+        EVENT_NAMES.append(name)
+        EVENT_CODES[name] = code
+        EVENT_HANDLERS.append(handler)
+    else:
+        EVENT_HANDLERS[code] = handler
+    return code
+
+
+def event_dict(entry, patients):
+    """
+    Expand a FEL entry into the event dict used by event logs and output.py.
+    Args:
+        entry (tuple): (time, seq, code, patient_id) entry of a future event list.
+        patients (dict or PatientStore): Patients of the run, to resolve patient_id.
+    Returns:
+        dict: {'event_type': name, 'time': time, 'patient': Patient or None}
+    """
+    time, _, code, patient_id = entry
+    return {
+        'event_type': EVENT_NAMES[code],
+        'time': time,
+        'patient': patients[patient_id] if patient_id is not None else None,
+    }
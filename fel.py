@@ -0,0 +1,215 @@
+"""
+Future event list (FEL) containers for the hospital simulation.
+"""
+
+import bisect
+import heapq
+
+
+class FutureEventList:
+    """
+    Future event list backed by a binary heap.
+
+    Entries are compact (time, seq, code, patient_id) tuples (see events.py),
+    where seq is a running counter, so events scheduled for the same time come
+    out in the order they were scheduled (same ordering as the old stable list
+    sort).
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self.journal = None  # set to a list to record every pushed entry (used by DeltaEventLog)
+
+    def push(self, time, code, patient_id=None):
+        """
+        Schedule an event.
+        Args:
+            time (float): Time of the event.
+            code (int): Event type code (see events.py).
+            patient_id (int): Id of the patient of the event, or None.
+        """
+        entry = (time, self._seq, code, patient_id)
+        heapq.heappush(self._heap, entry)
+        self._seq += 1
+        if self.journal is not None:
+            self.journal.append(entry)
+
+    def pop(self):
+        """Remove and return the earliest (time, seq, code, patient_id) entry."""
+        return heapq.heappop(self._heap)
+
+    def peek(self):
+        """Return the earliest entry without removing it."""
+        return self._heap[0]
+
+    def entries(self):
+        """Return the raw (time, seq, code, patient_id) entries, in no particular order."""
+        return list(self._heap)
+
+    def sorted_entries(self):
+        """Return the pending entries as a list in processing order."""
+        return sorted(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
+
+    def __iter__(self):
+        return iter(self.sorted_entries())
+
+
+class CalendarQueue:
+    """
+    Future event list backed by a calendar queue (R. Brown, 1988).
+
+    Pending events are hashed into buckets by time ("days" of a circular
+    "year"); dequeueing walks the buckets from the current day. The number of
+    buckets doubles/halves with the queue size and the bucket width is
+    re-estimated from the spacing of the earliest events on every resize, so
+    hold operations stay O(1) amortized for large pending sets.
+
+    Entries are (time, seq, code, patient_id) tuples like in FutureEventList,
+    so both backends return events in exactly the same order.
+    """
+
+    SAMPLE_SIZE = 25
+
+    def __init__(self, n_buckets=2, bucket_width=1.0):
+        self._seq = 0
+        self._size = 0
+        self.journal = None  # set to a list to record every pushed entry (used by DeltaEventLog)
+        self._setup(n_buckets, bucket_width)
+
+    def _setup(self, n_buckets, bucket_width):
+        self._n_buckets = n_buckets
+        self._width = bucket_width
+        self._buckets = [[] for _ in range(n_buckets)]
+        self._current_day = 0  # virtual bucket number, int(time / width)
+        self._grow_threshold = 2 * n_buckets
+        self._shrink_threshold = n_buckets // 2 - 2
+
+    def _day(self, time):
+        return int(time // self._width)
+
+    def _insert(self, entry):
+        day = int(entry[0] // self._width)
+        bucket = self._buckets[day % self._n_buckets]
+        if not bucket or entry > bucket[-1]:
+            bucket.append(entry)
+        else:
+            bisect.insort(bucket, entry)
+        if day < self._current_day:
+            # Event scheduled before the current day (e.g. a negative duration)
+            self._current_day = day
+
+    def push(self, time, code, patient_id=None):
+        """
+        Schedule an event.
+        Args:
+            time (float): Time of the event.
+            code (int): Event type code (see events.py).
+            patient_id (int): Id of the patient of the event, or None.
+        """
+        entry = (time, self._seq, code, patient_id)
+        self._insert(entry)
+        self._seq += 1
+        self._size += 1
+        if self.journal is not None:
+            self.journal.append(entry)
+        if self._size > self._grow_threshold:
+            self._resize(2 * self._n_buckets)
+
+    def _locate(self):
+        """Return the index of the bucket holding the earliest entry."""
+        n_buckets = self._n_buckets
+        buckets = self._buckets
+        width = self._width
+        day = self._current_day
+        for _ in range(n_buckets):
+            bucket = buckets[day % n_buckets]
+            if bucket and bucket[0][0] // width <= day:
+                self._current_day = day
+                return day % n_buckets
+            day += 1
+
+        # Nothing within a year of the current day: jump to the minimum directly
+        index = min((i for i in range(n_buckets) if buckets[i]), key=lambda i: buckets[i][0])
+        self._current_day = self._day(buckets[index][0][0])
+        return index
+
+    def pop(self):
+        """Remove and return the earliest (time, seq, code, patient_id) entry."""
+        if not self._size:
+            raise IndexError("pop from empty calendar queue")
+        entry = self._buckets[self._locate()].pop(0)
+        self._size -= 1
+        if self._size < self._shrink_threshold:
+            self._resize(self._n_buckets // 2)
+        return entry
+
+    def peek(self):
+        """Return the earliest entry without removing it."""
+        if not self._size:
+            raise IndexError("peek from empty calendar queue")
+        return self._buckets[self._locate()][0]
+
+    def _new_width(self, entries):
+        """Estimate a bucket width from the spacing of the earliest entries."""
+        sample = heapq.nsmallest(min(len(entries), self.SAMPLE_SIZE), entries)
+        if len(sample) < 2:
+            return self._width
+        gaps = [b[0] - a[0] for a, b in zip(sample, sample[1:])]
+        average = sum(gaps) / len(gaps)
+        # Ignore large outlying gaps, as in Brown's original estimate
+        close_gaps = [gap for gap in gaps if gap <= 2 * average]
+        if close_gaps:
+            average = sum(close_gaps) / len(close_gaps)
+        return 3 * average if average > 0 else self._width
+
+    def _resize(self, n_buckets):
+        entries = [entry for bucket in self._buckets for entry in bucket]
+        self._setup(max(n_buckets, 2), self._new_width(entries))
+        if entries:
+            entries.sort()
+            self._current_day = self._day(entries[0][0])
+            for entry in entries:
+                self._buckets[self._day(entry[0]) % self._n_buckets].append(entry)
+
+    def entries(self):
+        """Return the raw (time, seq, code, patient_id) entries, in no particular order."""
+        return [entry for bucket in self._buckets for entry in bucket]
+
+    def sorted_entries(self):
+        """Return the pending entries as a list in processing order."""
+        return sorted(self.entries())
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __iter__(self):
+        return iter(self.sorted_entries())
+
+
+FEL_BACKENDS = {
+    'heap': FutureEventList,
+    'calendar': CalendarQueue,
+}
+
+
+def make_future_event_list(backend='heap'):
+    """
+    Create an empty future event list.
+    Args:
+        backend (str): 'heap' (binary heap) or 'calendar' (calendar queue).
+    Returns:
+        FutureEventList or CalendarQueue
+    """
+    if backend not in FEL_BACKENDS:
+        raise ValueError(f"Unknown FEL backend {backend!r}, expected one of {sorted(FEL_BACKENDS)}")
+    return FEL_BACKENDS[backend]()
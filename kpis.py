@@ -0,0 +1,186 @@
+"""
+Vectorized patient KPIs.
+
+One columnar extraction of the patient timings, then every mean/max waiting
+time, time in system, re-surgery count and bed utilization is computed with
+NumPy masks in a single call. The numbers are the same as the per-patient
+loops in analysis.py (up to floating point summation order).
+"""
+
+from operator import attrgetter
+
+import numpy as np
+from models import PatientStore
+
+SECTION_CAPACITIES = {
+    "emergency": 10,
+    "lab": 3,
+    "pre_surgery": 25,
+    "surgery": 50,
+    "icu": 10,
+    "ward": 40,
+    "ccu": 5,
+}
+
+TIME_FIELDS = (
+    "arrival_time", "exit_time",
+    "emergency_entry_time", "pre_surgery_entry_time", "lab_entry_time", "surgery_entry_time",
+    "icu_entry_time", "ccu_entry_time", "ward_entry_time",
+    "emergency_end_time", "pre_surgery_end_time", "lab_end_time", "surgery_end_time",
+    "icu_end_time", "ccu_end_time",
+)
+
+
+def extract_patient_columns(patients):
+    """
+    Extract the patient timings needed for the KPIs as NumPy arrays.
+
+    Args:
+        patients (dict or PatientStore): Patients of a run. A PatientStore hands over its arrays without copying.
+
+    Returns:
+        dict: field name -> array, plus 'is_elective', 're_surgeries' and 'is_complex'.
+    """
+    if isinstance(patients, PatientStore):
+        columns = {name: patients.column(name) for name in TIME_FIELDS}
+        columns["is_elective"] = patients.column("is_elective")
+        columns["re_surgeries"] = patients.column("re_surgeries")
+        columns["is_complex"] = patients.column("operation_type") == 3
+        return columns
+
+    values = list(patients.values())
+    times = np.array(list(map(attrgetter(*TIME_FIELDS), values)), dtype=float).reshape(len(values), len(TIME_FIELDS))
+    columns = {name: times[:, i] for i, name in enumerate(TIME_FIELDS)}
+    other = list(map(attrgetter("is_elective", "re_surgeries", "operation_type"), values))
+    columns["is_elective"] = np.array([row[0] for row in other], dtype=bool)
+    columns["re_surgeries"] = np.array([row[1] for row in other], dtype=int)
+    columns["is_complex"] = np.array([row[2] == "complex" for row in other], dtype=bool)
+    return columns
+
+
+def _mean_and_max(waiting_times, empty_value=None):
+    """Average and maximum as computed by the analysis.py loops (maximum starts at 0)."""
+    if len(waiting_times) == 0:
+        return (0, 0) if empty_value is None else (empty_value, empty_value)
+    return waiting_times.sum() / len(waiting_times), max(0, waiting_times.max())
+
+
+def compute_patient_kpis(patients, simulation_time, capacities=None, empty_value=None):
+    """
+    Compute every patient-based KPI in one call.
+
+    Args:
+        patients (dict or PatientStore or dict of arrays): Patients of a run, or the output of
+            extract_patient_columns.
+        simulation_time (float): Total simulation time.
+        capacities (dict): Section name -> bed capacity for utilizations (default SECTION_CAPACITIES).
+        empty_value: Value of every mean and maximum taken over no patients (e.g. nan). By default these
+            follow analysis.py: 0, or an exception (raised, or returned for pre_surgery_avg_wait).
+
+    Returns:
+        dict: 'elective_mean_time', 'elective_count', 'emergency_mean_time', 'emergency_count' (minutes),
+            '{section}_avg_wait' / '{section}_max_wait' for lab, pre_surgery, surgery, icu, ccu and ward,
+            'avg_re_surgeries', 'total_re_surgeries' and '{section}_utilization' (percent).
+    """
+    if capacities is None:
+        capacities = SECTION_CAPACITIES
+    c = patients if isinstance(patients, dict) and "is_elective" in patients else extract_patient_columns(patients)
+    elective = c["is_elective"]
+    emergency = ~elective
+    kpis = {}
+
+    # 1. Mean time in system (calculate_mean_time_in_system)
+    finished = c["exit_time"] != 0
+    for name, mask in (("elective", finished & elective), ("emergency", finished & emergency)):
+        time_in_system = c["exit_time"][mask] - c["arrival_time"][mask]
+        kpis[f"{name}_mean_time"] = time_in_system.sum() / len(time_in_system) if len(time_in_system) else \
+            (0 if empty_value is None else empty_value)
+        kpis[f"{name}_count"] = int(mask.sum())
+
+    # 3. Waiting times
+    # lab (calculate_waiting_times)
+    in_lab = c["lab_entry_time"] != 0
+    from_emergency = in_lab & emergency & (c["emergency_entry_time"] != 0)
+    from_pre_surgery = in_lab & elective & (c["pre_surgery_entry_time"] != 0)
+    if np.any(in_lab & ~(from_emergency | from_pre_surgery)):
+        raise Exception("Error in code patients timing")
+    waits = np.concatenate([c["lab_entry_time"][from_emergency] - c["emergency_entry_time"][from_emergency],
+                            c["lab_entry_time"][from_pre_surgery] - c["pre_surgery_entry_time"][from_pre_surgery]])
+    kpis["lab_avg_wait"], kpis["lab_max_wait"] = _mean_and_max(waits, empty_value)
+
+    # pre_surgery (calculate_pre_surgery_waiting_times)
+    mask = elective & (c["pre_surgery_entry_time"] != 0)
+    waits = c["pre_surgery_entry_time"][mask] - c["arrival_time"][mask]
+    kpis["pre_surgery_avg_wait"], kpis["pre_surgery_max_wait"] = _mean_and_max(waits, empty_value)
+    if len(waits) == 0 and empty_value is None:
+        kpis["pre_surgery_avg_wait"] = Exception(" problem in pre surgery waiting_times")
+
+    # surgery (calculate_surgery_waiting_times)
+    in_surgery = c["surgery_entry_time"] != 0
+    from_emergency = in_surgery & emergency & (c["emergency_end_time"] != 0)
+    from_pre_surgery = in_surgery & elective & (c["pre_surgery_end_time"] != 0)
+    waits = np.concatenate([c["surgery_entry_time"][from_emergency] - c["emergency_end_time"][from_emergency],
+                            c["surgery_entry_time"][from_pre_surgery] - c["pre_surgery_end_time"][from_pre_surgery]])
+    if len(waits) == 0 and empty_value is None:
+        raise Exception("No patients have completed surgery waiting times calculation.")
+    kpis["surgery_avg_wait"], kpis["surgery_max_wait"] = _mean_and_max(waits, empty_value)
+
+    # icu and ccu (calculate_icu_waiting_times, calculate_ccu_waiting_times)
+    for section in ("icu", "ccu"):
+        entry = c[f"{section}_entry_time"]
+        mask = (entry != 0) & (entry > c["surgery_end_time"])
+        if section == "ccu":
+            mask &= c["surgery_end_time"] != 0
+        waits = entry[mask] - c["surgery_end_time"][mask]
+        kpis[f"{section}_avg_wait"], kpis[f"{section}_max_wait"] = _mean_and_max(waits, empty_value)
+
+    # ward (calculate_ward_waiting_times): from ICU, else CCU, else straight from surgery
+    in_ward = c["ward_entry_time"] != 0
+    previous_end = np.where(c["icu_end_time"] != 0, c["icu_end_time"],
+                            np.where(c["ccu_end_time"] != 0, c["ccu_end_time"], c["surgery_end_time"]))
+    mask = in_ward & (previous_end != 0)
+    if not mask.any() and empty_value is None:
+        raise Exception("No patients have completed Ward waiting times calculation.")
+    kpis["ward_avg_wait"], kpis["ward_max_wait"] = _mean_and_max(c["ward_entry_time"][mask] - previous_end[mask],
+                                                                 empty_value)
+
+    # 4. Re-surgeries (calculate_average_re_surgeries, calculate_re_surgeries)
+    complex_re_surgeries = c["re_surgeries"][c["is_complex"]]
+    if len(complex_re_surgeries):
+        kpis["avg_re_surgeries"] = complex_re_surgeries.sum() / len(complex_re_surgeries)
+    else:
+        kpis["avg_re_surgeries"] = 0 if empty_value is None else empty_value
+    kpis["total_re_surgeries"] = int(c["re_surgeries"].sum())
+
+    # 5. Bed utilization (calculate_bed_utilization)
+    for section, capacity in capacities.items():
+        total_bed_time = _total_bed_time(c, section, simulation_time)
+        kpis[f"{section}_utilization"] = (total_bed_time * 100) / (simulation_time * capacity)
+
+    return kpis
+
+
+def _total_bed_time(c, section, simulation_time):
+    """Total bed usage time of a section, with the entry/end conventions of calculate_bed_utilization."""
+    if section in ("emergency", "lab", "pre_surgery", "ward"):
+        entry = c[f"{section}_entry_time"]
+        end = {"emergency": c["surgery_entry_time"], "lab": c["lab_end_time"],
+               "pre_surgery": c["surgery_entry_time"], "ward": c["exit_time"]}[section]
+        # Patients still in the section are counted until the end of the simulation
+        end = np.where(end != 0, end, simulation_time)
+        mask = entry != 0
+    elif section == "surgery":
+        entry = c["surgery_entry_time"]
+        end = np.where(c["icu_entry_time"] != 0, c["icu_entry_time"],
+                       np.where(c["ccu_entry_time"] != 0, c["ccu_entry_time"],
+                                np.where(c["ward_entry_time"] != 0, c["ward_entry_time"], simulation_time)))
+        mask = (entry != 0) & (end != 0)
+    elif section in ("icu", "ccu"):
+        entry = c[f"{section}_entry_time"]
+        end = np.where(c["ward_entry_time"] != 0, c["ward_entry_time"],
+                       np.where(c["re_surgeries"] > 0, c["surgery_entry_time"], 0))
+        # Patients still in the section are not counted
+        mask = (entry != 0) & (end != 0)
+    else:
+        raise ValueError(f"Unknown section {section!r}")
+    return (end[mask] - entry[mask]).sum()
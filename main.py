@@ -63,6 +63,8 @@ import pandas as pd
 from simulation import starting_state, simulation
 from utils import set_seed
 from analysis import *
+from online_stats import StatisticsCollector
+from kpis import compute_patient_kpis
 from output import export_patients_to_excel, create_simulation_log
 
 LAMBDA_VALUE = 1/15
@@ -73,7 +75,8 @@ state, future_event_list = starting_state()
 # Set seed for reproducibility
 set_seed(776)
 simulation_time = 60 * 24 * 30
-event_log, patients, table = simulation(simulation_time)
+collector = StatisticsCollector()
+event_log, patients, table = simulation(simulation_time, log_mode='delta', collector=collector)
 
 # Print the event log
 '''for event in event_log:
@@ -97,12 +100,13 @@ print("emergency mean time in system : ", mean_time_in_system_emergency/(60*24),
 # ---------------------------------------------------  2  ------------------------------------------------
 print('')
 print('hello-kpi-2')
-emergency_queue_full_probability = calculate_emergency_queue_full_probability(event_log, simulation_time)
+emergency_queue_full_probability = collector.emergency_queue_full_probability(simulation_time)
 print('emergency_queue_full_probability', ' : ', emergency_queue_full_probability)
 # ---------------------------------------------------  3  ------------------------------------------------
 sections = ['lab', 'pre_surgery', 'surgery', 'icu', 'ward', 'ccu']
 for section in sections:
-    avg_queue, max_queue, avg_wait, max_wait = calculate_section_metrics(event_log, simulation_time, patients, section)
+    avg_queue, max_queue, avg_wait, max_wait = calculate_section_metrics(event_log, simulation_time, patients, section,
+                                                                         collector=collector)
     # Print results in a formatted way
     print(f'\nkpi-3 Metrics for {section.upper()}:')
     print(f'Average Queue Length: {avg_queue:>12.4f}')
@@ -127,18 +131,15 @@ sections = [
     {"name": "ward", "capacity": 40, "display": "ward_utilization       "},
     {"name": "ccu", "capacity": 5, "display": "ccu_utilization        "}
 ]
-# Calculate utilization for each section
+# Calculate utilization for every section in one vectorized pass
+patient_kpis = compute_patient_kpis(patients, simulation_time,
+                                    capacities={section["name"]: section["capacity"] for section in sections})
 for section in sections:
-    utilization = calculate_bed_utilization(
-        patients,
-        simulation_time,
-        bed_capacity=section["capacity"],
-        section_name=section["name"]
-    )
+    utilization = patient_kpis[f'{section["name"]}_utilization']
     print(f'{section["display"]} : {utilization}')
 
 print('bye bye')
-print(len(event_log[-1]["state_snapshot"]["surgery_list"]))
+print(len(event_log.state_at(-1)["surgery_list"]))
 
 export_patients_to_excel(patients, filename="patients_output.xlsx")
 file_name = create_simulation_log(event_log, simulation_time)
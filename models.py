@@ -1,5 +1,18 @@
+import numpy as np
+
 
 class Patient:
+    # Fixed attribute layout (no per-instance __dict__): runs create tens of thousands of patients
+    __slots__ = (
+        "id", "arrival_time", "is_elective", "current_state", "surgery_type", "kind",
+        "emergency_entry_time", "pre_surgery_entry_time", "lab_entry_time", "surgery_entry_time",
+        "icu_entry_time", "ccu_entry_time", "ward_entry_time",
+        "exit_time",
+        "emergency_end_time", "pre_surgery_end_time", "lab_end_time", "surgery_end_time",
+        "icu_end_time", "ccu_end_time", "ward_end_time",
+        "operation_type", "re_surgeries",
+    )
+
     def __init__(self, patient_id, arrival_time, is_elective):
         self.id = patient_id
         self.arrival_time = arrival_time
@@ -33,3 +46,193 @@ class Patient:
 
         # Re-surgery counter for complex surgeries
         self.re_surgeries = 0
+
+
+OPERATION_TYPES = (None, "simple", "medium", "complex")  # operation_type codes in PatientStore
+
+TIME_COLUMNS = (
+    "arrival_time",
+    "emergency_entry_time", "pre_surgery_entry_time", "lab_entry_time", "surgery_entry_time",
+    "icu_entry_time", "ccu_entry_time", "ward_entry_time",
+    "exit_time",
+    "emergency_end_time", "pre_surgery_end_time", "lab_end_time", "surgery_end_time",
+    "icu_end_time", "ccu_end_time", "ward_end_time",
+)
+OBJECT_COLUMNS = ("current_state", "surgery_type", "kind")
+
+
+class _ArrayColumn:
+    """Descriptor exposing one NumPy column of a PatientStore as a PatientView attribute."""
+
+    def __init__(self, name, convert):
+        self.name = name
+        self.convert = convert
+
+    def __get__(self, view, owner):
+        if view is None:
+            return self
+        return self.convert(view._store._arrays[self.name][view._index])
+
+    def __set__(self, view, value):
+        view._store._arrays[self.name][view._index] = value
+
+
+class _ListColumn:
+    """Descriptor exposing one Python-object column of a PatientStore as a PatientView attribute."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, view, owner):
+        if view is None:
+            return self
+        return view._store._lists[self.name][view._index]
+
+    def __set__(self, view, value):
+        view._store._lists[self.name][view._index] = value
+
+
+class PatientView:
+    """
+    Lightweight handle on one row of a PatientStore.
+
+    Has the same attributes as Patient, so the event handlers and analysis functions
+    can use it unchanged; reads and writes go straight to the store's columns.
+    """
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    @property
+    def id(self):
+        return self._index + 1
+
+    @property
+    def operation_type(self):
+        return OPERATION_TYPES[self._store._arrays["operation_type"][self._index]]
+
+    @operation_type.setter
+    def operation_type(self, value):
+        self._store._arrays["operation_type"][self._index] = OPERATION_TYPES.index(value)
+
+    is_elective = _ArrayColumn("is_elective", bool)
+    re_surgeries = _ArrayColumn("re_surgeries", int)
+
+    def to_patient(self):
+        """Return a detached Patient copy of this row."""
+        patient = Patient(self.id, 0, self.is_elective)
+        for name in Patient.__slots__:
+            setattr(patient, name, getattr(self, name))
+        return patient
+
+    def __deepcopy__(self, memo):
+        # Snapshots (e.g. the full event log) copy the patient, not the whole store
+        return self.to_patient()
+
+    def __repr__(self):
+        return f"PatientView(id={self.id})"
+
+
+for _name in TIME_COLUMNS:
+    setattr(PatientView, _name, _ArrayColumn(_name, float))
+for _name in OBJECT_COLUMNS:
+    setattr(PatientView, _name, _ListColumn(_name))
+
+
+class PatientStore:
+    """
+    Columnar (struct-of-arrays) patient store backed by growable NumPy arrays.
+
+    Drop-in replacement for the {patient_id: Patient} dict used by the simulation:
+    indexing by patient id returns a PatientView, and len(), keys(), values(), items()
+    work as for a dict. Patient ids must be consecutive starting at 1. The arrays double
+    in size when full. columns() hands the raw arrays to vectorized code (kpis, pandas)
+    without building Patient objects.
+    """
+
+    def __init__(self, capacity=1024):
+        self._size = 0
+        self._capacity = capacity
+        self._arrays = {name: np.zeros(capacity) for name in TIME_COLUMNS}
+        self._arrays["is_elective"] = np.zeros(capacity, dtype=bool)
+        self._arrays["operation_type"] = np.zeros(capacity, dtype=np.int8)
+        self._arrays["re_surgeries"] = np.zeros(capacity, dtype=np.int32)
+        self._lists = {name: [] for name in OBJECT_COLUMNS}
+        self._views = []
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, array in self._arrays.items():
+            grown = np.zeros(self._capacity, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            self._arrays[name] = grown
+
+    def create(self, patient_id, arrival_time, is_elective):
+        """
+        Add a patient (same defaults as Patient(...)) and return its view.
+        Re-creating an existing id resets that patient, like assigning into the dict.
+        """
+        index = patient_id - 1
+        if index == self._size:
+            if self._size == self._capacity:
+                self._grow()
+            self._size += 1
+            for values in self._lists.values():
+                values.append(None)
+            self._views.append(PatientView(self, index))
+        elif not 0 <= index < self._size:
+            raise ValueError(f"Patient ids must be consecutive: expected {self._size + 1}, got {patient_id}")
+
+        for array in self._arrays.values():
+            array[index] = 0
+        self._arrays["is_elective"][index] = is_elective
+        self._lists["current_state"][index] = "Arrived"
+        self._lists["surgery_type"][index] = None
+        self._lists["kind"][index] = None
+        return self._views[index]
+
+    def column(self, name):
+        """Return the column `name` for all patients (a view on the NumPy array, or a list)."""
+        if name == "id":
+            return np.arange(1, self._size + 1)
+        if name in self._lists:
+            return self._lists[name]
+        return self._arrays[name][:self._size]
+
+    def columns(self):
+        """
+        Return all columns as a dict of NumPy arrays (no copies for numeric columns).
+        operation_type is decoded to an object array of strings/None.
+        """
+        columns = {"id": self.column("id")}
+        for name in self._arrays:
+            columns[name] = self.column(name)
+        columns["operation_type"] = np.array(OPERATION_TYPES, dtype=object)[columns["operation_type"]]
+        for name in OBJECT_COLUMNS:
+            columns[name] = np.array(self._lists[name], dtype=object)
+        return columns
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, patient_id):
+        if not 1 <= patient_id <= self._size:
+            raise KeyError(patient_id)
+        return self._views[patient_id - 1]
+
+    def __contains__(self, patient_id):
+        return 1 <= patient_id <= self._size
+
+    def __iter__(self):
+        return iter(range(1, self._size + 1))
+
+    def keys(self):
+        return range(1, self._size + 1)
+
+    def values(self):
+        return list(self._views)
+
+    def items(self):
+        return list(zip(range(1, self._size + 1), self._views))
@@ -0,0 +1,324 @@
+"""
+Online (streaming) statistics for the hospital simulation.
+
+The collector is updated by simulation() after every event, so time-weighted
+KPIs are available without keeping per-event snapshots of the state.
+"""
+
+import numpy as np
+
+QUEUE_NAMES = ['emergency_list', 'lab_list', 'pre_surgery_list', 'surgery_list', 'icu_list', 'ccu_list', 'ward_list']
+
+# State key -> state key of its capacity (None when the quantity has no capacity).
+# Queues (lists or queues.py containers in the state) are tracked by their length.
+TRACKED_QUANTITIES = {
+    **{queue_name: None for queue_name in QUEUE_NAMES},
+    "emergency_queue": "emergency_queue_capacity",
+    "pre_surgery_queue": None,
+    "emergency_patients": "emergency_capacity",
+    "lab_patients": "lab_capacity",
+    "pre_surgery_patients": "pre_surgery_capacity",
+    "operating_room_patients": "operating_room_capacity",
+    "icu_patients": "icu_capacity",
+    "ccu_patients": "ccu_capacity",
+    "ward_patients": "ward_capacity",
+}
+
+# Section -> (occupancy counter, capacity key) in the state, for utilizations from the occupancy
+SECTION_OCCUPANCIES = {
+    "emergency": ("emergency_patients", "emergency_capacity"),
+    "lab": ("lab_patients", "lab_capacity"),
+    "pre_surgery": ("pre_surgery_patients", "pre_surgery_capacity"),
+    "surgery": ("operating_room_patients", "operating_room_capacity"),
+    "icu": ("icu_patients", "icu_capacity"),
+    "ward": ("ward_patients", "ward_capacity"),
+    "ccu": ("ccu_patients", "ccu_capacity"),
+}
+
+
+class TimeWeightedStatistic:
+    """
+    Time-weighted accumulator for a piecewise-constant quantity (queue length, occupancy...).
+
+    Only changes of the value cost anything. Like the event-log based functions in
+    analysis.py, the value recorded after an event holds until the next event, and the
+    value after the last event does not count towards the maximum.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.value = 0
+        self.full = False
+        self.since = None  # time of the last change
+        self.since_step = 0  # event number of the last change
+        self.area = 0.0
+        self.full_time = 0.0
+        self.maximum = 0
+
+    def change(self, time, step, value, full=False):
+        """Record that the quantity became `value` (and `full` or not) after event number `step`."""
+        if self.since is not None:
+            elapsed = time - self.since
+            self.area += self.value * elapsed
+            if self.full:
+                self.full_time += elapsed
+            if self.value > self.maximum:
+                self.maximum = self.value
+        self.value = value
+        self.full = full
+        self.since = time
+        self.since_step = step
+
+    def totals(self, time, step):
+        """
+        Return (area, full_time, maximum) as of event number `step` at `time`.
+        Args:
+            time (float): Time of the last event.
+            step (int): Number of the last event.
+        """
+        if self.since is None:
+            return 0.0, 0.0, 0
+        elapsed = time - self.since
+        area = self.area + self.value * elapsed
+        full_time = self.full_time + elapsed if self.full else self.full_time
+        maximum = max(self.maximum, self.value) if self.since_step < step else self.maximum
+        return area, full_time, maximum
+
+
+class StatisticsCollector:
+    """
+    Collects time-weighted statistics of every queue and occupancy counter while the simulation runs.
+
+    Pass an instance to simulation(..., collector=...); it is updated after every event. For each
+    quantity in TRACKED_QUANTITIES it keeps the time-average, the maximum and the time spent at
+    capacity (value >= capacity, with the capacity read from the state so power outages count).
+    """
+
+    def __init__(self):
+        self.statistics = {name: TimeWeightedStatistic(name) for name in TRACKED_QUANTITIES}
+        self._tracked = [(name, capacity_key, self.statistics[name])
+                         for name, capacity_key in TRACKED_QUANTITIES.items()]
+        self.step = -1
+        self.time = 0
+
+    def record(self, time, state):
+        """
+        Update the statistics with the state right after an event.
+        Args:
+            time (float): Time of the event.
+            state (dict): Current state of the hospital.
+        """
+        self.step += 1
+        self.time = time
+        step = self.step
+        for name, capacity_key, statistic in self._tracked:
+            value = state[name]
+            if capacity_key is None:
+                if type(value) is not int:
+                    value = len(value)  # queue
+                if value != statistic.value or step == 0:
+                    statistic.change(time, step, value)
+            else:
+                full = value >= state[capacity_key]
+                if value != statistic.value or full != statistic.full or step == 0:
+                    statistic.change(time, step, value, full)
+
+    def start(self, time, state):
+        """
+        Start the statistics from a state reached without this collector (e.g. a restored checkpoint),
+        so the time from `time` to the next event counts with the values of `state`.
+        Args:
+            time (float): Time the statistics start at.
+            state (dict): State of the hospital at that time.
+        """
+        self.record(time, state)
+
+    def time_average(self, name, simulation_time):
+        """Time-average of a tracked quantity over simulation_time."""
+        area, full_time, maximum = self.statistics[name].totals(self.time, self.step)
+        return area / simulation_time if simulation_time > 0 else 0
+
+    def maximum(self, name):
+        """Maximum of a tracked quantity (the value after the last event is not counted)."""
+        return self.statistics[name].totals(self.time, self.step)[2]
+
+    def time_at_capacity(self, name):
+        """Total time a tracked quantity spent at (or above) its capacity."""
+        return self.statistics[name].totals(self.time, self.step)[1]
+
+    def queue_length_stats(self, simulation_time, queue_name):
+        """
+        Average and maximum length of a queue, as analysis.calculate_queue_length_stats.
+
+        Returns:
+            tuple: (average_queue_length, max_queue_length)
+        """
+        return self.time_average(queue_name, simulation_time), self.maximum(queue_name)
+
+    def emergency_queue_full_probability(self, simulation_time):
+        """Probability of the emergency queue being full, as analysis.calculate_emergency_queue_full_probability."""
+        return self.time_at_capacity("emergency_queue") / simulation_time
+
+
+class BatchStatisticsCollector(StatisticsCollector):
+    """
+    StatisticsCollector that also splits the time-weighted statistics into consecutive batches.
+
+    At every batch boundary (start, start + batch_length, ...) it stores the running area and time
+    at capacity of each quantity, so batch_averages() gives one time-average per batch and quantity
+    from a single run (for batch-means confidence intervals, see steady_state.py).
+    """
+
+    def __init__(self, batch_length, n_batches, start=0):
+        """
+        Args:
+            batch_length (float): Length of a batch (minutes).
+            n_batches (int): Number of batches; boundaries after the last batch are ignored.
+            start (float): Start of the first batch (end of the warm-up period).
+        """
+        super().__init__()
+        self.batch_length = batch_length
+        self.boundaries = [start + i * batch_length for i in range(n_batches + 1)]
+        self.snapshots = []  # one {name: (area, full_time)} per boundary passed
+
+    def record(self, time, state):
+        # The values recorded by the previous event hold until `time`, so boundaries before it
+        # are snapshotted before the statistics change
+        while len(self.snapshots) < len(self.boundaries) and time >= self.boundaries[len(self.snapshots)]:
+            boundary = self.boundaries[len(self.snapshots)]
+            self.snapshots.append({name: statistic.totals(boundary, self.step)[:2]
+                                   for name, statistic in self.statistics.items()})
+        super().record(time, state)
+
+    def batch_averages(self, name):
+        """
+        Time-average of a tracked quantity in each completed batch.
+        Returns:
+            list: One value per batch.
+        """
+        areas = [snapshot[name][0] for snapshot in self.snapshots]
+        return [(end - begin) / self.batch_length for begin, end in zip(areas, areas[1:])]
+
+    def batch_fractions_at_capacity(self, name):
+        """Fraction of each completed batch a tracked quantity spent at (or above) its capacity."""
+        full_times = [snapshot[name][1] for snapshot in self.snapshots]
+        return [(end - begin) / self.batch_length for begin, end in zip(full_times, full_times[1:])]
+
+
+def mser_truncation(values, batch_size=5):
+    """
+    MSER-m truncation point of a series (MSER-5 by default).
+
+    The series is averaged in non-overlapping batches of `batch_size` values; the truncation point is
+    the number of batches d < k / 2 (for k batches) that minimizes the marginal standard error
+    sum((z_i - mean(z[d:]))^2 for i >= d) / (k - d)^2. It is computed for every d at once with
+    suffix sums.
+
+    Args:
+        values (list): Series (e.g. bin averages of a queue length), in time order.
+        batch_size (int): Number of values per batch.
+    Returns:
+        int: Number of leading values to delete (a multiple of batch_size), or None when the minimum is
+            at the last candidate before the half-way limit: the series does not settle within the run
+            (e.g. a growing queue).
+    """
+    k = len(values) // batch_size
+    if k < 2:
+        return 0
+    z = np.asarray(values[:k * batch_size], dtype=float).reshape(k, batch_size).mean(axis=1)
+    # Suffix sums: sums[d] = sum(z[d:]), squares[d] = sum(z[d:] ** 2)
+    sums = np.cumsum(z[::-1])[::-1]
+    squares = np.cumsum((z * z)[::-1])[::-1]
+    remaining = np.arange(k, 0, -1)
+    mser = (squares - sums * sums / remaining) / remaining ** 2
+    candidates = (k + 1) // 2  # d < k / 2
+    d = int(np.argmin(mser[:candidates]))
+    if d == candidates - 1 and d > 0:
+        return None
+    return d * batch_size
+
+
+# Quantities whose total (the patients in the hospital's beds) detects the warm-up by default. The queue
+# lengths are left out: the lab and pre-surgery queues grow through the whole run, so any total containing
+# them never settles (truncation_points still reports every queue on its own).
+WARMUP_QUANTITIES = [occupancy for occupancy, _ in SECTION_OCCUPANCIES.values()]
+
+
+class WarmupStatisticsCollector(StatisticsCollector):
+    """
+    StatisticsCollector that also keeps the time-average of every quantity in consecutive bins of
+    `bin_width`, so the end of the warm-up can be found with MSER-5 (truncation_time) and the
+    time-weighted KPIs can be reported from that point on (time_average_between...).
+
+    Bins are closed while the simulation runs (one snapshot of the running totals per bin), so
+    no event log is needed and the truncation point can be asked for at any time.
+    """
+
+    def __init__(self, bin_width=60):
+        """
+        Args:
+            bin_width (float): Width of a bin (minutes).
+        """
+        super().__init__()
+        self.bin_width = bin_width
+        self.snapshots = []  # {name: (area, full_time)} at times 0, bin_width, 2 * bin_width...
+
+    def record(self, time, state):
+        # As in BatchStatisticsCollector, close the bins that ended before this event first
+        while time >= len(self.snapshots) * self.bin_width:
+            boundary = len(self.snapshots) * self.bin_width
+            self.snapshots.append({name: statistic.totals(boundary, self.step)[:2]
+                                   for name, statistic in self.statistics.items()})
+        super().record(time, state)
+
+    def bin_averages(self, name):
+        """Time-average of a tracked quantity in each closed bin."""
+        areas = [snapshot[name][0] for snapshot in self.snapshots]
+        return [(end - begin) / self.bin_width for begin, end in zip(areas, areas[1:])]
+
+    def truncation_time(self, names=None, batch_size=5):
+        """
+        End of the warm-up period: the MSER truncation point of the total of the given quantities.
+
+        One series is truncated rather than the latest point over many: with a dozen noisy series the
+        latest point is nearly always at the MSER limit. Queues of overloaded sections grow through the
+        whole run and never settle, so they are not in the default total; truncation_points shows the
+        point of every quantity on its own. If the total does not settle, half of the closed bins are
+        deleted (the MSER limit): the run is too short to tell its warm-up.
+
+        Args:
+            names (list): Tracked quantities to add up (WARMUP_QUANTITIES by default).
+            batch_size (int): MSER batch size, in bins.
+        Returns:
+            float: Truncation time (a multiple of bin_width).
+        """
+        names = WARMUP_QUANTITIES if names is None else names
+        total = np.sum([self.bin_averages(name) for name in names], axis=0)
+        point = mser_truncation(total, batch_size)
+        if point is None:
+            return (len(self.snapshots) - 1) // 2 * self.bin_width
+        return point * self.bin_width
+
+    def truncation_points(self, names=None, batch_size=5):
+        """
+        MSER truncation point of every tracked quantity on its own, to see which quantities settle late.
+        Returns:
+            dict: Quantity name -> truncation time, or None if it does not settle within the run.
+        """
+        names = list(self.statistics) if names is None else names
+        points = {name: mser_truncation(self.bin_averages(name), batch_size) for name in names}
+        return {name: None if point is None else point * self.bin_width for name, point in points.items()}
+
+    def time_average_between(self, name, start, end):
+        """Time-average of a tracked quantity between two bin boundaries."""
+        first, last = self.snapshots[round(start / self.bin_width)], self.snapshots[round(end / self.bin_width)]
+        return (last[name][0] - first[name][0]) / (end - start)
+
+    def fraction_at_capacity_between(self, name, start, end):
+        """Fraction of the time between two bin boundaries a tracked quantity spent at (or above) its capacity."""
+        first, last = self.snapshots[round(start / self.bin_width)], self.snapshots[round(end / self.bin_width)]
+        return (last[name][1] - first[name][1]) / (end - start)
+
+    def last_boundary(self, simulation_time):
+        """Latest bin boundary at or before simulation_time (KPIs from the bins end there)."""
+        return min(int(simulation_time // self.bin_width), len(self.snapshots) - 1) * self.bin_width
@@ -4,6 +4,34 @@ Functions for saving and exporting simulation results.
 
 import pandas as pd
 from datetime import datetime
+from models import PatientStore
+
+# Patient attribute -> column header of the patients Excel file
+PATIENT_EXPORT_COLUMNS = {
+    "id": "Patient ID",
+    "arrival_time": "Arrival Time",
+    "is_elective": "Is Elective",
+    "current_state": "Current State",
+    "surgery_type": "Surgery Type",
+    "kind": "Kind",
+    "emergency_entry_time": "Emergency Entry Time",
+    "pre_surgery_entry_time": "Pre-Surgery Entry Time",
+    "lab_entry_time": "Lab Entry Time",
+    "surgery_entry_time": "Surgery Entry Time",
+    "icu_entry_time": "ICU Entry Time",
+    "ccu_entry_time": "CCU Entry Time",
+    "ward_entry_time": "Ward Entry Time",
+    "exit_time": "Exit Time",
+    "emergency_end_time": "Emergency End Time",
+    "pre_surgery_end_time": "Pre-Surgery End Time",
+    "lab_end_time": "Lab End Time",
+    "surgery_end_time": "Surgery End Time",
+    "icu_end_time": "ICU End Time",
+    "ccu_end_time": "CCU End Time",
+    "ward_end_time": "Ward End Time",
+    "operation_type": "Operation Type",
+    "re_surgeries": "Re-Surgeries",
+}
 
 
 def print_all_patients(patients):
@@ -113,41 +141,22 @@ def export_patients_to_excel(patients, filename="patients_output.xlsx"):
     Exports a dictionary of Patient objects to an Excel file.
 
     Args:
-        patients (dict): Dictionary of Patient objects (key: patient_id, value: Patient object).
+        patients (dict or PatientStore): Dictionary of Patient objects (key: patient_id, value: Patient object),
+            or a columnar PatientStore, whose arrays are handed to pandas directly.
         filename (str): Name of the output Excel file.
     """
-    # Convert Patient objects to a list of dictionaries
-    data = []
-    for patient_id, patient in patients.items():
-        patient_data = {
-            "Patient ID": patient.id,
-            "Arrival Time": patient.arrival_time,
-            "Is Elective": patient.is_elective,
-            "Current State": patient.current_state,
-            "Surgery Type": patient.surgery_type,
-            "Kind": patient.kind,
-            "Emergency Entry Time": patient.emergency_entry_time,
-            "Pre-Surgery Entry Time": patient.pre_surgery_entry_time,
-            "Lab Entry Time": patient.lab_entry_time,
-            "Surgery Entry Time": patient.surgery_entry_time,
-            "ICU Entry Time": patient.icu_entry_time,
-            "CCU Entry Time": patient.ccu_entry_time,
-            "Ward Entry Time": patient.ward_entry_time,
-            "Exit Time": patient.exit_time,
-            "Emergency End Time": patient.emergency_end_time,
-            "Pre-Surgery End Time": patient.pre_surgery_end_time,
-            "Lab End Time": patient.lab_end_time,
-            "Surgery End Time": patient.surgery_end_time,
-            "ICU End Time": patient.icu_end_time,
-            "CCU End Time": patient.ccu_end_time,
-            "Ward End Time": patient.ward_end_time,
-            "Operation Type": patient.operation_type,
-            "Re-Surgeries": patient.re_surgeries,
-        }
-        data.append(patient_data)
-
-    # Create a DataFrame from the list of dictionaries
-    df = pd.DataFrame(data)
+    if isinstance(patients, PatientStore):
+        columns = patients.columns()
+        df = pd.DataFrame({header: columns[name] for name, header in PATIENT_EXPORT_COLUMNS.items()}, copy=False)
+    else:
+        # Convert Patient objects to a list of dictionaries
+        data = []
+        for patient_id, patient in patients.items():
+            patient_data = {header: getattr(patient, name) for name, header in PATIENT_EXPORT_COLUMNS.items()}
+            data.append(patient_data)
+
+        # Create a DataFrame from the list of dictionaries
+        df = pd.DataFrame(data)
 
     # Save the DataFrame to an Excel file
     df.to_excel(filename, index=False, engine="openpyxl")
@@ -0,0 +1,178 @@
+"""
+Queue containers for the waiting lists in the hospital state.
+
+Entries keep the dict shape used throughout the simulation
+({"time", "is_elective", "patient_id"}), so code that iterates a queue or
+takes its len() works unchanged. Every queue has a `version` counter that is
+bumped on each change, so snapshot code (DeltaEventLog) can skip unchanged
+queues without comparing their contents.
+"""
+
+from collections import deque
+from itertools import chain
+
+
+class _Queue:
+    """Comparison and repr shared by the queue containers (they compare equal to lists with the same entries)."""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+class FifoQueue(_Queue, deque):
+    """
+    First-in first-out waiting list: a deque that counts its changes.
+
+    Replaces lists that were re-sorted by 'time' after every append (entries
+    already arrive in time order) and consumed with the O(n) list.pop(0).
+    len(), truth tests and iteration are the plain deque ones, so the per-event
+    statistics and snapshots cost no more than with a list. Every deque method
+    that changes the contents bumps the version.
+    """
+
+    def __init__(self, entries=()):
+        self.version = 0
+        super().__init__(entries)
+
+    def append(self, entry):
+        """
+        Add an entry at the end of the queue.
+        Args:
+            entry (dict): Queue entry.
+        """
+        super().append(entry)
+        self.version += 1
+
+    def popleft(self):
+        """Remove and return the first (oldest) entry."""
+        entry = super().popleft()
+        self.version += 1
+        return entry
+
+    # The other deque mutators, so that no change of the contents goes unnoticed by snapshot code
+
+    def appendleft(self, entry):
+        super().appendleft(entry)
+        self.version += 1
+
+    def extend(self, entries):
+        super().extend(entries)
+        self.version += 1
+
+    def extendleft(self, entries):
+        super().extendleft(entries)
+        self.version += 1
+
+    def insert(self, index, entry):
+        super().insert(index, entry)
+        self.version += 1
+
+    def pop(self):
+        entry = super().pop()
+        self.version += 1
+        return entry
+
+    def remove(self, entry):
+        super().remove(entry)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def rotate(self, n=1):
+        super().rotate(n)
+        self.version += 1
+
+    def reverse(self):
+        super().reverse()
+        self.version += 1
+
+    def __setitem__(self, index, entry):
+        super().__setitem__(index, entry)
+        self.version += 1
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.version += 1
+
+    def __iadd__(self, entries):
+        self.extend(entries)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self.version += 1
+        return self
+
+
+class TwoClassQueue(_Queue):
+    """
+    Waiting list with two priority classes: emergency (non-elective) entries are
+    served before elective ones, and each class is first-in first-out.
+
+    This is the order the old `.sort(key=lambda x: (x['is_elective'], x['time']))`
+    after every append produced, since entries are added in time order. Enqueue,
+    dequeue and the per-class counts are O(1).
+    """
+
+    __slots__ = ('_emergency', '_elective', 'version')
+
+    def __init__(self, entries=()):
+        self._emergency = deque()
+        self._elective = deque()
+        self.version = 0
+        for entry in entries:
+            self.append(entry)
+
+    def append(self, entry):
+        """
+        Add an entry at the end of its class.
+        Args:
+            entry (dict): Queue entry with at least an 'is_elective' key.
+        """
+        if entry['is_elective']:
+            self._elective.append(entry)
+        else:
+            self._emergency.append(entry)
+        self.version += 1
+
+    def popleft(self):
+        """Remove and return the first entry (the oldest emergency entry, else the oldest elective one)."""
+        if self._emergency:
+            entry = self._emergency.popleft()
+        elif self._elective:
+            entry = self._elective.popleft()
+        else:
+            raise IndexError("pop from an empty queue")
+        self.version += 1
+        return entry
+
+    @property
+    def emergency_count(self):
+        """Number of waiting emergency (non-elective) entries."""
+        return len(self._emergency)
+
+    @property
+    def elective_count(self):
+        """Number of waiting elective entries."""
+        return len(self._elective)
+
+    def __len__(self):
+        return len(self._emergency) + len(self._elective)
+
+    def __bool__(self):
+        return bool(self._emergency) or bool(self._elective)
+
+    def __iter__(self):
+        return chain(self._emergency, self._elective)
+
+
+QUEUE_TYPES = (FifoQueue, TwoClassQueue)
@@ -1,15 +1,26 @@
+import os
+import pickle
+import sys
 import numpy as np
 import math
-from simulation import starting_state, simulation
-from utils import set_seed
+from concurrent.futures import ProcessPoolExecutor
+import random
+from context import SimulationContext
+from control_variates import CONTROLS, attach_control_recorders, control_values, control_variate_estimate
+from simulation import simulation
+from utils import set_seed, AntitheticVariates
 from analysis import *
+from online_stats import StatisticsCollector, WarmupStatisticsCollector, SECTION_OCCUPANCIES
+from kpis import compute_patient_kpis, extract_patient_columns
 
 
-def confidence_interval(data):
+def confidence_interval(data, controls=None):
     """
     Calculate the two-sided confidence interval for a list of data using a z-distribution.
     Assumes data is at least roughly normal or n is large enough for CLT.
     and alpha is 5%
+    With controls (control name -> realized values, one per replication) the mean is the
+    control-variate estimate of control_variates.control_variate_estimate.
     """
     z = 1.96  # z-score for 95% confidence
     mean_value = np.mean(data)
@@ -18,129 +29,359 @@ def confidence_interval(data):
     if n < 2:
         return (mean_value, None, None)  # Cannot compute CI with fewer than 2 data points
 
+    if controls:
+        mean_value, standard_error = control_variate_estimate(data, controls)
+        margin_of_error = z * standard_error
+        return mean_value, mean_value - margin_of_error, mean_value + margin_of_error
+
     margin_of_error = z * (std_dev / math.sqrt(n))
     lower_bound = mean_value - margin_of_error
     upper_bound = mean_value + margin_of_error
     return mean_value, lower_bound, upper_bound
 
 
-def run_single_replication(seed, simulation_time):
-    """Run a single replication of the simulation with the given seed."""
+def run_single_replication(seed, simulation_time, antithetic=False, collector=None):
+    """
+    Run a single replication of the simulation with the given seed.
+    No event log is kept; queue KPIs are collected online.
+    With antithetic=True the run is the antithetic twin of the plain run of this seed (see utils.AntitheticVariates).
+    `collector` replaces the default StatisticsCollector (e.g. a WarmupStatisticsCollector).
+    Returns:
+        tuple: (patients, StatisticsCollector, controls), controls being the realized control
+            variates of the run (see control_variates.CONTROLS)
+    """
     set_seed(seed)
-    state, future_event_list = starting_state()
-    event_log, patients, table = simulation(simulation_time)
-    return event_log, patients
-
-
-def run_multiple_replications(n_replications, simulation_time=60 * 24 * 30):
-    """Run multiple replications and collect metrics in lists."""
-
-    # Initialize lists for each metric
-    metrics = {
-        'elective_mean_time': [],
-        'emergency_mean_time': [],
-        'elective_count': [],
-        'emergency_count': [],
-        'emergency_queue_full_prob': [],
-        'avg_re_surgeries': [],
-        'total_re_surgeries': []
-    }
+    collector = collector if collector is not None else StatisticsCollector()
+    rng = AntitheticVariates(random) if antithetic else None
+    context = SimulationContext(collector=collector, rng=rng)
+    recorders = attach_control_recorders(context)
+    event_log, patients, table = simulation(simulation_time, log_mode='none', context=context)
+    return patients, collector, control_values(recorders)
+
+
+SECTIONS = ['lab', 'pre_surgery', 'surgery', 'icu', 'ward', 'ccu']
+SECTION_CONFIGS = [
+    {"name": "emergency", "capacity": 10},
+    {"name": "lab", "capacity": 3},
+    {"name": "pre_surgery", "capacity": 25},
+    {"name": "surgery", "capacity": 50},
+    {"name": "icu", "capacity": 10},
+    {"name": "ward", "capacity": 40},
+    {"name": "ccu", "capacity": 5}
+]
+
+
+def replication_kpis(seed, simulation_time, antithetic=False, truncate_warmup=False):
+    """
+    Run one replication and reduce it to its KPI dict (metric name -> value).
+    This is the unit of work of the process pool, so only the small dict crosses processes.
+    With truncate_warmup=True the end of the warm-up is found with MSER-5 over hourly bins of the
+    number of patients in the hospital's beds (WarmupStatisticsCollector) and the KPIs are computed from there:
+    patient KPIs over the patients arriving after it, time averages and utilizations (from the
+    occupancy counters) over the bins after it. Maxima still cover the whole run.
+    """
+    collector = WarmupStatisticsCollector() if truncate_warmup else None
+    patients, collector, controls = run_single_replication(seed=seed, simulation_time=simulation_time,
+                                                           antithetic=antithetic, collector=collector)
+    warmup_time = collector.truncation_time() if truncate_warmup else None
+    return compute_replication_kpis(seed, simulation_time, patients, collector, controls, warmup_time)
+
+
+def compute_replication_kpis(seed, simulation_time, patients, collector, controls, warmup_time=None):
+    """
+    Reduce a finished run to its KPI dict (metric name -> value).
+    Args:
+        seed (int): Seed of the run (for error messages).
+        simulation_time (float): Simulation time of the run.
+        patients (dict or PatientStore): Patients of the run.
+        collector (StatisticsCollector): Online statistics of the run.
+        controls (dict): Realized control variates of the run (see control_variates.control_values).
+        warmup_time (float): Delete everything before this time (a bin boundary of `collector`, which
+            must then be a WarmupStatisticsCollector); None keeps the whole run.
+    """
+    truncate_warmup = warmup_time is not None
+    if truncate_warmup:
+        end_time = collector.last_boundary(simulation_time)
+        columns = extract_patient_columns(patients)
+        after_warmup = columns["arrival_time"] >= warmup_time
+        patients = {name: column[after_warmup] for name, column in columns.items()}
+
+    # All patient-based KPIs in one vectorized pass
+    patient_kpis = compute_patient_kpis(patients, simulation_time,
+                                        capacities={config["name"]: config["capacity"] for config in SECTION_CONFIGS})
+    kpis = {}
 
-    # Initialize section-specific metrics
-    sections = ['lab', 'pre_surgery', 'surgery', 'icu', 'ward', 'ccu']
-    for section in sections:
-        metrics[f'{section}_avg_queue'] = []
-        metrics[f'{section}_max_queue'] = []
-        metrics[f'{section}_avg_wait'] = []
-        metrics[f'{section}_max_wait'] = []
-        metrics[f'{section}_utilization'] = []
+    # KPI 1: Mean time in system
+    kpis['elective_mean_time'] = patient_kpis['elective_mean_time'] / (60 * 24)  # Convert to days
+    kpis['emergency_mean_time'] = patient_kpis['emergency_mean_time'] / (60 * 24)  # Convert to days
+    kpis['elective_count'] = patient_kpis['elective_count']
+    kpis['emergency_count'] = patient_kpis['emergency_count']
 
-    # Add emergency utilization
-    metrics['emergency_utilization'] = []
+    # KPI 2: Emergency queue full probability
+    if truncate_warmup:
+        kpis['emergency_queue_full_prob'] = collector.fraction_at_capacity_between("emergency_queue", warmup_time,
+                                                                                   end_time)
+    else:
+        kpis['emergency_queue_full_prob'] = collector.emergency_queue_full_probability(simulation_time)
+
+    # KPI 4: Re-surgeries
+    kpis['avg_re_surgeries'] = patient_kpis['avg_re_surgeries']
+    kpis['total_re_surgeries'] = patient_kpis['total_re_surgeries']
+
+    # KPI 3: Section metrics
+    for section in SECTIONS:
+        kpis[f'{section}_avg_queue'], kpis[f'{section}_max_queue'] = \
+            collector.queue_length_stats(simulation_time, f"{section}_list")
+        if truncate_warmup:
+            kpis[f'{section}_avg_queue'] = collector.time_average_between(f"{section}_list", warmup_time, end_time)
+        kpis[f'{section}_avg_wait'] = patient_kpis[f'{section}_avg_wait']
+        kpis[f'{section}_max_wait'] = patient_kpis[f'{section}_max_wait']
+
+    # KPI 5: Utilizations
+    for config in SECTION_CONFIGS:
+        utilization = patient_kpis[f'{config["name"]}_utilization']
+        if truncate_warmup:
+            occupancy, _ = SECTION_OCCUPANCIES[config["name"]]
+            utilization = collector.time_average_between(occupancy, warmup_time, end_time) * 100 / config["capacity"]
+            utilization = min(utilization, 100.0)  # a full section can come out a rounding error above 100%
+        # Assert with detailed error message
+        assert 0 <= utilization <= 100.0, f"""
+            Invalid utilization detected!
+            seed: {seed}
+            Section: {config['name']}
+            Capacity: {config['capacity']}
+            Utilization: {utilization:.2f}%
+            """
+        kpis[f'{config["name"]}_utilization'] = utilization
+
+    # Control variates (inputs with a known mean), used by print_results
+    kpis.update(controls)
+
+    if truncate_warmup:
+        kpis['warmup_time'] = warmup_time / (60 * 24)  # Convert to days
+
+    return kpis
+
+
+def run_multiple_replications(n_replications, simulation_time=60 * 24 * 30, n_workers=1, antithetic=False,
+                              truncate_warmup=False):
+    """
+    Run multiple replications and collect metrics in lists.
+
+    Args:
+        n_replications (int): Number of replications (seeds 776, 777, ...).
+        simulation_time (float): Simulation time of each replication.
+        n_workers (int): Number of worker processes; 1 runs sequentially in this process.
+            Results are identical for any number of workers: every replication is seeded
+            on its own and the metrics are collected in seed order.
+        antithetic (bool): Run the replications in antithetic pairs: pair k runs seed 776 + k once
+            plainly and once as its antithetic twin (utils.AntitheticVariates). n_replications must be even, and every
+            metric list holds one pair average per pair, so confidence intervals are built on the
+            (independent) pair averages.
+        truncate_warmup (bool): Report the KPIs of each replication from its MSER-5 warm-up truncation
+            point on (see replication_kpis); the truncation points are in 'warmup_time' (days).
+    Returns:
+        dict: Metric name -> list of values, one per replication (per pair with antithetic=True).
+    """
+    if antithetic:
+        if n_replications % 2:
+            raise ValueError(f"Antithetic replications run in pairs, got an odd n_replications={n_replications}")
+        seeds = [776 + i // 2 for i in range(n_replications)]
+        antithetic_flags = [i % 2 == 1 for i in range(n_replications)]
+    else:
+        seeds = [776 + i for i in range(n_replications)]
+        antithetic_flags = [False] * n_replications
 
     print(f"Running {n_replications} replications...")
-    for i in range(n_replications):
-        print(f"Replication {i + 1}/{n_replications}")
-        event_log, patients = run_single_replication(seed=776 + i, simulation_time=simulation_time)
-
-        # KPI 1: Mean time in system
-        mean_time_elective, counter_elective, mean_time_emergency, counter_emergency = calculate_mean_time_in_system(
-            patients)
-        metrics['elective_mean_time'].append(mean_time_elective / (60 * 24))  # Convert to days
-        metrics['emergency_mean_time'].append(mean_time_emergency / (60 * 24))  # Convert to days
-        metrics['elective_count'].append(counter_elective)
-        metrics['emergency_count'].append(counter_emergency)
-
-        # KPI 2: Emergency queue full probability
-        emergency_prob = calculate_emergency_queue_full_probability(event_log, simulation_time)
-        metrics['emergency_queue_full_prob'].append(emergency_prob)
-
-        # KPI 3: Section metrics
-        for section in sections:
-            avg_queue, max_queue, avg_wait, max_wait = calculate_section_metrics(event_log, simulation_time, patients,
-                                                                                 section)
-            metrics[f'{section}_avg_queue'].append(avg_queue)
-            metrics[f'{section}_max_queue'].append(max_queue)
-            metrics[f'{section}_avg_wait'].append(avg_wait)
-            metrics[f'{section}_max_wait'].append(max_wait)
-
-        # KPI 4: Re-surgeries
-        metrics['avg_re_surgeries'].append(calculate_average_re_surgeries(patients))
-        metrics['total_re_surgeries'].append(calculate_re_surgeries(patients))
-
-        # KPI 5: Utilizations
-        section_configs = [
-            {"name": "emergency", "capacity": 10},
-            {"name": "lab", "capacity": 3},
-            {"name": "pre_surgery", "capacity": 25},
-            {"name": "surgery", "capacity": 50},
-            {"name": "icu", "capacity": 10},
-            {"name": "ward", "capacity": 40},
-            {"name": "ccu", "capacity": 5}
-        ]
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            # map() yields results in submission (seed) order, whatever the completion order
+            results = list(pool.map(replication_kpis, seeds, [simulation_time] * n_replications, antithetic_flags,
+                                    [truncate_warmup] * n_replications))
+    else:
+        results = []
+        for i, (seed, flag) in enumerate(zip(seeds, antithetic_flags)):
+            print(f"Replication {i + 1}/{n_replications}")
+            results.append(replication_kpis(seed, simulation_time, flag, truncate_warmup))
 
-        for config in section_configs:
-            utilization = calculate_bed_utilization(
-                patients,
-                simulation_time,
-                bed_capacity=config["capacity"],
-                section_name=config["name"]
-            )
-            '''assert 0 <= utilization <= 100.0, f"""Invalid utilization detected!
-                                Section: {config['name']}
-                                Utilization: {utilization:.2f}%
-                                Replication: {i + 1}
-                                Date and Time: 2025-01-31 10:56:42
-                                User: alirezayazdan813
-                                """'''
-            # utilization /= (i + 1)
-            for j in metrics[f'{config["name"]}_utilization']:
-                utilization -= j
-            # Debug print
-            print(f"""
-                Section: {config['name']}
-                Capacity: {config['capacity']}
-                Utilization: {utilization:.2f}%
-                """)
-
-            # Assert with detailed error message
-            assert 0 <= utilization <= 100.0, f"""
-                Invalid utilization detected!
-                seed: {776+i}
-                Section: {config['name']}
-                Capacity: {config['capacity']}
-                Utilization: {utilization:.2f}%
-                Replication: {i + 1}
-                Date and Time: 2025-01-31 11:12:20
-                User: alirezayazdan813
-                """
-            metrics[f'{config["name"]}_utilization'].append(utilization)
+    if antithetic:
+        # Average each plain run with its antithetic twin
+        results = [{name: (plain[name] + twin[name]) / 2 for name in plain}
+                   for plain, twin in zip(results[::2], results[1::2])]
 
+    # Collect each metric into a list, one value per replication
+    metrics = {name: [kpis[name] for kpis in results] for name in results[0]} if results else {}
     return metrics
 
 
-def print_results(metrics):
-    """Print results with confidence intervals for all metrics."""
+def run_forked_replications(n_replications, warmup_time=60 * 24 * 7, simulation_time=60 * 24 * 37, n_workers=None,
+                            warmup_seed=775):
+    """
+    Warm the hospital up once, then fork one child process per replication from the warmed-up model.
+
+    The children share the warmed-up state copy-on-write (nothing is pickled or re-imported). Each one
+    reseeds its substreams, runs the rest of the horizon and sends only its KPI dict back through a pipe.
+    KPIs cover the time after the warm-up, as with truncate_warmup (see compute_replication_kpis).
+    Needs os.fork (Linux, macOS).
+
+    Args:
+        n_replications (int): Number of replications (replication i reseeds with 776 + i).
+        warmup_time (float): Length of the shared warm-up (minutes, a multiple of an hour).
+        simulation_time (float): End of every replication, warm-up included.
+        n_workers (int): Number of children running at once (os.cpu_count() by default).
+        warmup_seed (int): Seed of the substreams of the warm-up run.
+    Returns:
+        dict: Metric name -> list of values, one per replication, as run_multiple_replications.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    context = SimulationContext(seed=warmup_seed, substreams=True)
+    simulation(warmup_time, log_mode='none', context=context, pause=True)
+    seeds = [776 + i for i in range(n_replications)]
+
+    print(f"Warmed up for {warmup_time / (60 * 24):.1f} days, running {n_replications} replications...")
+    sys.stdout.flush()  # otherwise every child would print the parent's buffered output again
+    results = []
+    for first in range(0, n_replications, n_workers):
+        children = []
+        for seed in seeds[first:first + n_workers]:
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                _forked_replication(context, seed, warmup_time, simulation_time, write_fd)
+            os.close(write_fd)
+            children.append((pid, read_fd))
+        # Read and reap every child of the batch before raising, so none is left behind
+        outcomes = []
+        for pid, read_fd in children:
+            with os.fdopen(read_fd, 'rb') as pipe:
+                data = pipe.read()
+            _, status = os.waitpid(pid, 0)
+            outcomes.append(_child_outcome(pid, data, status))
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        results.extend(outcomes)
+
+    metrics = {name: [kpis[name] for kpis in results] for name in results[0]} if results else {}
+    return metrics
+
+
+def _child_outcome(pid, data, status):
+    """Unpickle what a forked child sent; a RuntimeError if it died without a complete result."""
+    try:
+        return pickle.loads(data)
+    except Exception:  # nothing or a truncated payload, e.g. the child was killed by a signal
+        return RuntimeError(f"Replication child {pid} sent no result "
+                            f"(exit code {os.waitstatus_to_exitcode(status)})")
+
+
+def _forked_replication(context, seed, warmup_time, simulation_time, write_fd):
+    """Body of a forked child: run one replication from the warmed-up context and exit."""
+    try:
+        collector = WarmupStatisticsCollector()
+        collector.start(warmup_time, context.state)  # the warmed-up state holds until the first event
+        context.collector = collector
+        context.reseed(seed)
+        recorders = attach_control_recorders(context)
+        _, patients, _ = simulation(simulation_time, log_mode='none', context=context)
+        outcome = compute_replication_kpis(seed, simulation_time, patients, collector, control_values(recorders),
+                                           warmup_time=collector.last_boundary(warmup_time))
+    except BaseException as error:
+        outcome = error
+    try:
+        data = pickle.dumps(outcome)
+    except Exception:  # e.g. an exception carrying something unpicklable
+        data = pickle.dumps(RuntimeError(repr(outcome)))
+    with os.fdopen(write_fd, 'wb') as pipe:
+        pipe.write(data)
+    os._exit(0)  # skip the parent's cleanup (atexit handlers, buffered output)
+
+
+def relative_half_width(data, controls=None):
+    """
+    Half-width of the 95% confidence interval of `data` relative to its mean.
+    Returns:
+        float: inf when the interval cannot be computed yet; 0 for a constant zero KPI.
+    """
+    mean, lower, upper = confidence_interval(data, controls)
+    if lower is None or not np.isfinite(upper - lower):
+        return math.inf
+    half_width = (upper - lower) / 2
+    if mean == 0:
+        return 0.0 if half_width == 0 else math.inf
+    return half_width / abs(mean)
+
+
+def run_to_precision(kpi_names, relative_precision=0.1, simulation_time=60 * 24 * 30, n_workers=1,
+                     batch_size=None, min_replications=5, max_replications=50, truncate_warmup=False):
+    """
+    Run replications in batches until the 95% CI of every selected KPI is precise enough.
+
+    After each batch, a KPI is done once its relative half-width (see relative_half_width) is at most
+    `relative_precision`; replications stop when all selected KPIs are done or the budget is spent.
+    Seeds are 776, 777, ... as in run_multiple_replications, so the metrics of the first n runs are the
+    ones run_multiple_replications(n) returns.
+
+    Args:
+        kpi_names (list): KPI names (keys of replication_kpis) that must reach the precision.
+        relative_precision (float): Target half-width, as a fraction of the mean.
+        simulation_time (float): Simulation time of each replication.
+        n_workers (int): Number of worker processes; 1 runs sequentially in this process.
+        batch_size (int): Replications per batch; n_workers by default, so every batch fills the pool.
+        min_replications (int): Replications before the first precision check (small samples
+            underestimate the variance and would stop too early).
+        max_replications (int): Budget: replications are never run past this number.
+        truncate_warmup (bool): Delete the MSER-5 warm-up of every replication (see replication_kpis).
+    Returns:
+        tuple: (metrics, runs_needed), metrics as returned by run_multiple_replications and
+            runs_needed mapping each KPI of kpi_names to the number of replications after which it
+            reached the precision (None if the budget ran out first).
+    """
+    batch_size = batch_size or n_workers
+    pool = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    results = []
+    runs_needed = dict.fromkeys(kpi_names)
+    try:
+        while len(results) < max_replications:
+            n_batch = min(max(batch_size, min_replications - len(results)), max_replications - len(results))
+            seeds = [776 + len(results) + i for i in range(n_batch)]
+            print(f"Running replications {len(results) + 1}-{len(results) + n_batch}...")
+            if pool is not None:
+                results.extend(pool.map(replication_kpis, seeds, [simulation_time] * n_batch, [False] * n_batch,
+                                        [truncate_warmup] * n_batch))
+            else:
+                results.extend(replication_kpis(seed, simulation_time, False, truncate_warmup) for seed in seeds)
+
+            for name in kpi_names:
+                if runs_needed[name] is None:
+                    precision = relative_half_width([kpis[name] for kpis in results])
+                    if precision <= relative_precision:
+                        runs_needed[name] = len(results)
+            if all(runs is not None for runs in runs_needed.values()):
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    metrics = {name: [kpis[name] for kpis in results] for name in results[0]} if results else {}
+
+    print(f"\nReplications needed for a relative half-width of {relative_precision:.0%}:")
+    for name, runs in runs_needed.items():
+        print(f"  {name}: {runs if runs is not None else f'not reached in {len(results)}'}")
+    return metrics, runs_needed
+
+
+def print_results(metrics, control_variates=True):
+    """
+    Print results with confidence intervals for all metrics.
+    With control_variates=True (and the control_* lists of run_multiple_replications in `metrics`),
+    a control-variate interval is printed under the plain one.
+    nan values (e.g. batches without patients, see steady_state.batch_means) are left out of the
+    intervals; their number is printed with the sample size.
+    """
+    controls = {name: metrics[name] for name in CONTROLS if name in metrics} if control_variates else {}
+
     categories = {
         'Patient Time in System (days)': [
             'elective_mean_time',
@@ -171,6 +412,9 @@ def print_results(metrics):
                                     f'{section}_max_wait' for section in
                                     ['lab', 'pre_surgery', 'surgery', 'icu', 'ward', 'ccu']
                                 ],
+        'Warm-up (days)': [
+            'warmup_time'
+        ],
         'Utilizations': [
             f'{section}_utilization' for section in ['emergency', 'lab', 'pre_surgery', 'surgery', 'icu', 'ward', 'ccu']
         ]
@@ -184,21 +428,41 @@ def print_results(metrics):
         print("-" * 40)
         for metric_name in metric_names:
             if metric_name in metrics:
-                mean, lower, upper = confidence_interval(metrics[metric_name])
+                finite = [not _is_nan(value) for value in metrics[metric_name]]
+                values = [value for value, keep in zip(metrics[metric_name], finite) if keep]
+                dropped = len(finite) - len(values)
                 print(f"{metric_name}:")
+                if not values:
+                    print(f"  No values: all {dropped} are nan")
+                    continue
+                mean, lower, upper = confidence_interval(values)
                 print(f"  Mean: {mean:.4f}")
                 if lower is not None and upper is not None:
                     print(f"  95% CI: [{lower:.4f}, {upper:.4f}]")
                     print(f"  Half-width: {(upper - lower) / 2:.4f}")
+                    if controls:
+                        kept_controls = {name: [value for value, keep in zip(control, finite) if keep]
+                                         for name, control in controls.items()}
+                        cv_mean, cv_lower, cv_upper = confidence_interval(values, kept_controls)
+                        print(f"  Control-variate mean: {cv_mean:.4f}")
+                        print(f"  Control-variate 95% CI: [{cv_lower:.4f}, {cv_upper:.4f}]")
+                        print(f"  Control-variate half-width: {(cv_upper - cv_lower) / 2:.4f}")
                 else:
                     print("  95% CI: Insufficient data for confidence interval")
                     print("  Half-width: Not available")
-                print(f"  Sample size: {len(metrics[metric_name])}")
+                print(f"  Sample size: {len(values)}" + (f" ({dropped} nan left out)" if dropped else ""))
+
+
+def _is_nan(value):
+    """Whether a metric value is nan (other values, including non-numbers, are kept)."""
+    return isinstance(value, float) and math.isnan(value)
 
 
 if __name__ == "__main__":
-    # Run simulation with 10 replications and collect metrics
-    metrics = run_multiple_replications(n_replications=10)
+    # Run replications until the main KPIs are known within 10% (at most 50 runs)
+    metrics, runs_needed = run_to_precision(
+        ['elective_mean_time', 'emergency_mean_time', 'ward_utilization', 'icu_utilization'],
+        relative_precision=0.1, n_workers=os.cpu_count() or 1)
 
     # Print results with confidence intervals
     print_results(metrics)
@@ -1,18 +1,30 @@
 import copy
-from models import Patient
+from models import Patient, PatientStore
+from fel import make_future_event_list
+from event_log import DeltaEventLog
+from events import EventType, EVENT_NAMES, EVENT_HANDLERS, register_event_type, event_dict
+from context import SimulationContext
+from queues import FifoQueue, TwoClassQueue
+from tracing import EVENTS, DETAIL, STATE
 from utils import *
 
-patients = {}
 LAMBDA_VALUE = 1/15
 
 
 # Function to initialize the starting state
-def starting_state():
+def starting_state(fel_backend='heap', context=None):
     """
     Initialize the starting state of the simulation with defined variables.
+    Args:
+        fel_backend (str): Future event list implementation, 'heap' or 'calendar'.
+        context (SimulationContext): Run to initialize; its state and future event list are set here.
+            A fresh context (global RNG, dict of patients) is used when omitted.
     Returns:
         tuple: (state dictionary, future event list)
     """
+    if context is None:
+        context = SimulationContext(fel_backend=fel_backend)
+    capacities = context.capacities
     state = {
         # Patients and Queues
         "pre_surgery_patients": 0,  # Number of patients in pre-surgery section (N)
@@ -31,14 +43,14 @@ def starting_state():
         "finished_patients": 0,  # (F)
 
         # Capacities
-        "emergency_queue_capacity": 10,
-        "pre_surgery_capacity": 25,
-        "emergency_capacity": 10,
-        "lab_capacity": 3,
-        "ward_capacity": 40,
-        "icu_capacity": 10,
-        "ccu_capacity": 5,
-        "operating_room_capacity": 50,
+        "emergency_queue_capacity": capacities["emergency_queue_capacity"],
+        "pre_surgery_capacity": capacities["pre_surgery_capacity"],
+        "emergency_capacity": capacities["emergency_capacity"],
+        "lab_capacity": capacities["lab_capacity"],
+        "ward_capacity": capacities["ward_capacity"],
+        "icu_capacity": capacities["icu_capacity"],
+        "ccu_capacity": capacities["ccu_capacity"],
+        "operating_room_capacity": capacities["operating_room_capacity"],
 
         # Hospital Status
         "power_status": 1,  # Power status of the hospital (1 = On, 0 = Off) (ES)
@@ -47,143 +59,170 @@ def starting_state():
         "discharged_patients": 0,  # Number of discharged patients (F)
 
         # Queues and Lists
-        "emergency_list": [],  # List of patients in ambulance
-        "lab_list": [],  # List of patients in lab queue (Lab_List)
-        "pre_surgery_list": [],  # List of patients in pre_surgery queue
-        "surgery_list": [],  # List of patients in operating room queue (priority and arrival time) (OR)
-        "icu_list": [],  # list of patients in operating room in queue of icu
-        "ccu_list": [],  # list of patients in operating room in queue of icu
-        "ward_list": []  # List of patients in ward queue (Ward_List)
+        "emergency_list": FifoQueue(),  # List of patients in ambulance
+        "lab_list": TwoClassQueue(),  # List of patients in lab queue, emergencies first (Lab_List)
+        "pre_surgery_list": FifoQueue(),  # List of patients in pre_surgery queue
+        "surgery_list": TwoClassQueue(),  # List of patients in operating room queue (priority and arrival time) (OR)
+        "icu_list": FifoQueue(),  # list of patients in operating room in queue of icu
+        "ccu_list": FifoQueue(),  # list of patients in operating room in queue of icu
+        "ward_list": FifoQueue()  # List of patients in ward queue (Ward_List)
     }
 
-    future_event_list = []
+    future_event_list = make_future_event_list(context.fel_backend)
+    context.state, context.future_event_list = state, future_event_list
 
     # Schedule first patient arrival
-    new_patient = Patient(patient_id=1, arrival_time=0, is_elective=True)
-    patients[1] = new_patient
+    new_patient = create_patient(context.patients, patient_id=1, arrival_time=0, is_elective=True)
 
-    future_event_list.append({
-        'event_type': 'new_arrival',
-        'time': 0.1,
-        'patient': new_patient  # ???
-    })
-    S = 24 * 60 * discrete_uniform(1, 30)
-    fel_maker(future_event_list, "power_out", 0.1, S, None)
+    future_event_list.push(0.1, EventType.NEW_ARRIVAL, new_patient.id)
+    S = 24 * 60 * context.streams["power"].discrete_uniform(1, 30)
+    fel_maker(future_event_list, EventType.POWER_OUT, 0.1, S, None)
 
     return state, future_event_list
 
 
+def create_patient(patients, patient_id, arrival_time, is_elective):
+    """
+    Create a patient in a patient store.
+    Args:
+        patients (dict or PatientStore): Patients of the run (dict of Patient objects or PatientStore).
+    Returns:
+        Patient or PatientView: The new patient.
+    """
+    if isinstance(patients, PatientStore):
+        return patients.create(patient_id, arrival_time, is_elective)
+    new_patient = Patient(patient_id, arrival_time, is_elective)
+    patients[patient_id] = new_patient
+    return new_patient
+
+
 def fel_maker(future_event_list, event_type, current_time, s, patient):  # S = duration time
     event_time = current_time + s
 
-    # Add the event to the future event list
-    future_event_list.append({
-        'event_type': event_type,
-        'time': event_time,
-        'patient': patient  # patient kind or operation type and other inf
-    })
-
-    # Sort the future event list by time
-    future_event_list.sort(key=lambda x: x['time'])
+    # Add the event to the future event list (kept in time order by the heap);
+    # event_type is an EventType code and only the patient id is stored
+    future_event_list.push(event_time, event_type, patient.id if patient is not None else None)
 
 
-def simulation(simulation_time):
+def simulation(simulation_time, fel_backend='heap', log_mode='full', collector=None, patient_store='dict',
+               context=None, pause=False):
     """
     Runs the hospital simulation for the given time period.
     Args:
         simulation_time (float): Total simulation time.
+        fel_backend (str): Future event list implementation, 'heap' (default) or 'calendar'.
+            'calendar' pays off when very many events are pending at once.
+        log_mode (str): 'full' logs a deep copy of the state and FEL after every event;
+            'delta' logs only the changed state keys (a DeltaEventLog, rebuilt on access);
+            'none' keeps no per-event log at all (use a collector for queue KPIs).
+        collector (StatisticsCollector): Optional online statistics, updated after every event.
+        patient_store (str): 'dict' keeps Patient objects in a dict; 'columnar' keeps the patients
+            in a NumPy-backed PatientStore whose columns() feed vectorized code directly.
+        context (SimulationContext): Run in this context (own RNG, capacities, surgery durations...).
+            When given, fel_backend, collector and patient_store are taken from the context instead.
+            A context restored from a checkpoint (see checkpoint.py) continues its run from the
+            checkpoint time instead of the empty starting state; simulation_time stays absolute.
+        pause (bool): Leave the first event after simulation_time pending instead of processing it, and
+            end the context at simulation_time, so the run can continue (or be checkpointed) from exactly
+            that time, e.g. after a warm-up.
     Returns:
         list: Event log containing details of all processed events.
     """
-    # Initialize starting state and future event list
-    state, future_event_list = starting_state()
-    event_log = []
+    if log_mode not in ('full', 'delta', 'none'):
+        raise ValueError(f"Unknown log_mode {log_mode!r}, expected 'full', 'delta' or 'none'")
+    # Every run has its own context (state, FEL, patients...), so runs in one process are independent
+    if context is None:
+        context = SimulationContext(fel_backend=fel_backend, patient_store=patient_store, collector=collector)
+    collector = context.collector
+    trace = context.trace
+
+    # Initialize starting state and future event list (a restored context already has them)
+    if context.state is None:
+        starting_state(context=context)
+    state, future_event_list = context.state, context.future_event_list
+    patients = context.patients
+    if log_mode == 'delta':
+        event_log = DeltaEventLog(patients=patients)
+        future_event_list.journal = []
+    else:
+        event_log = []
     table = []
     step = 1
+    handlers = EVENT_HANDLERS
 
     # Run the simulation loop
-    current_time = 0
+    current_time = context.time
     while current_time <= simulation_time and future_event_list:
+        if pause and future_event_list.peek()[0] > simulation_time:
+            break
         # Get the next event
-        current_event = future_event_list.pop(0)
-        current_time = current_event['time']
-        patient = current_event.get('patient')
-
-        # Process event
-        if current_event['event_type'] == 'new_arrival':
-            new_arrival(state, future_event_list, current_time)
-        elif current_event['event_type'] == 'lab_free':
-            lab_free(state, future_event_list, current_time, patient)
-        elif current_event['event_type'] == 'emergency_done':
-            emergency_done(state, future_event_list, current_time, patient)
-        elif current_event['event_type'] == 'pre_surgery_done':
-            pre_surgery_done(state, future_event_list, current_time, patient)
-        elif current_event['event_type'] == 'surgery_done':
-            surgery_done(state, future_event_list, current_time, patient)
-        elif current_event['event_type'] == 'surgery_free':
-            surgery_free(state, future_event_list, current_time)
-        elif current_event['event_type'] == 'icu_done':
-            icu_done(state, future_event_list, current_time, patient)
-        elif current_event['event_type'] == 'ccu_done':
-            ccu_done(state, future_event_list, current_time, patient)
-        elif current_event['event_type'] == 'ward_done':
-            ward_done(state, future_event_list, current_time, patient)
-        elif current_event['event_type'] == 'power_out':
-            power_out(state, future_event_list, current_time)
-        elif current_event['event_type'] == 'power_restore':
-            power_restore(state, future_event_list, current_time)
+        current_time, _, code, patient_id = future_event_list.pop()
+        patient = patients[patient_id] if patient_id is not None else None
+        if trace.level >= EVENTS:
+            trace.emit(current_time, "event", event_type=EVENT_NAMES[code], patient=patient_id)
+
+        # Process event (handlers are registered per event code, see events.py)
+        handlers[code](context, current_time, patient)
 
         # checking emergency queue list
         ''' assert state["emergency_queue"] == len(state["emergency_list"]), \
             f"Emergency queue mismatch: queue={state['emergency_queue']}, list={len(state['emergency_list'])} " \
-            f"and event type : {current_event['event_type']}"'''
+            f"and event type : {EVENT_NAMES[code]}"'''
+
+        if collector is not None:
+            collector.record(current_time, state)
 
         # Log the event
-        event_log.append({
-            "time": current_time,
-            "event_type": current_event['event_type'],
-            "patient": current_event.get('patient'),
-            "state_snapshot": copy.deepcopy(state),  # state.copy()
-            "future_event_list": copy.deepcopy(future_event_list)
-        })
+        if log_mode == 'full':
+            event_log.append({
+                "time": current_time,
+                "event_type": EVENT_NAMES[code],
+                "patient": patient,
+                "state_snapshot": copy.deepcopy(state),  # state.copy()
+                "future_event_list": copy.deepcopy([event_dict(entry, patients)
+                                                    for entry in future_event_list.sorted_entries()])
+            })
+        elif log_mode == 'delta':
+            event_log.append(current_time, code, patient, state, future_event_list)
 
         # create a row in the event_log (table)
         # table.append(create_row(step, current_event, state, data, future_event_list))
         step += 1
-    print(f"deceased patients : {state['deceased_patients']}")
-    print(f"Surgery Queue at {current_time}: {len(state['surgery_list'])}")
+    context.time = simulation_time if pause else current_time
+    if trace.level >= EVENTS:
+        trace.emit(current_time, "summary", deceased_patients=state['deceased_patients'],
+                   surgery_queue=len(state['surgery_list']))
+    trace.flush()
 
-    return event_log, patients, table
+    return event_log, context.patients, table
 
 
 # ------------------------------------------------   events  -------------------------------------------------
 
 
-def new_arrival(state, future_event_list, current_time):
+def new_arrival(context, current_time, patient=None):
     """
     Handles the arrival of a new patient at the hospital.
     Args:
-        state (dict): Current state of the hospital.
-        future_event_list (list): Future event list.
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time.
     """
+    state, future_event_list, patients = context.state, context.future_event_list, context.patients
+    trace = context.trace
     # Generate a new patient
-    print('New arrival at time:', current_time)
-
-    is_emergency = random.random() > 0.75  # 25% chance of being an emergency patient
-    is_emergency_group = random.random() > 0.995  # 5% chance of being grouped
+    is_emergency = context.streams["arrivals"].random() > 0.75  # 25% chance of being an emergency patient
+    is_emergency_group = context.streams["group_size"].random() > 0.995  # 5% chance of being grouped
 
     if is_emergency:
         if is_emergency_group:
-            state["emergency_patients_entered"] = discrete_uniform(2, 5)
+            state["emergency_patients_entered"] = context.streams["group_size"].discrete_uniform(2, 5)
         else:
             state["emergency_patients_entered"] = 1
 
         if state["emergency_patients_entered"] + state["emergency_queue"] <= 10:
             for i in range(state["emergency_patients_entered"]):
                 patient_id = len(patients) + 1
-                new_patient = Patient(patient_id, current_time, is_elective=False)
-                patients[patient_id] = new_patient
+                new_patient = create_patient(patients, patient_id, current_time, is_elective=False)
                 new_patient.arrival_time = current_time
                 # Check if the emergency queue is below capacity
                 if state["emergency_patients"] + state["emergency_patients_entered"] <= state["emergency_capacity"]:
@@ -196,16 +235,16 @@ def new_arrival(state, future_event_list, current_time):
                     if state["lab_patients"] < state["lab_capacity"]:
                         state["lab_patients"] += 1
                         new_patient.lab_entry_time = current_time
-                        S = discrete_uniform(28, 32) + 10
-                        fel_maker(future_event_list, "lab_free", current_time, S, new_patient)
+                        S = context.streams["lab_service"].discrete_uniform(28, 32) + 10
+                        fel_maker(future_event_list, EventType.LAB_FREE, current_time, S, new_patient)
                     else:
-                        print(f"Patient {patient_id} added to lab_list at time {current_time}")
+                        if trace.level >= DETAIL:
+                            trace.emit(current_time, "queued", patient=patient_id, queue="lab_list")
                         state["lab_list"].append({
                             "time": current_time,
                             "is_elective": False,
                             "patient_id": patient_id
                         })
-                        state["lab_list"].sort(key=lambda x: (x['is_elective'], x['time']))
                 else:
                     state["emergency_queue"] += 1
                     state["emergency_list"].append({
@@ -221,12 +260,11 @@ def new_arrival(state, future_event_list, current_time):
 
     else:
         patient_id = len(patients) + 1
-        new_patient = Patient(patient_id, current_time, is_elective=True)
-        patients[patient_id] = new_patient
+        new_patient = create_patient(patients, patient_id, current_time, is_elective=True)
         new_patient.arrival_time = current_time
         # Handle normal patients
         if state["pre_surgery_queue"] == 0:
-            process_pre_surgery(state, future_event_list, current_time, new_patient)
+            process_pre_surgery(context, current_time, new_patient)
         else:
             state["pre_surgery_queue"] += 1
             state["pre_surgery_list"].append({
@@ -236,41 +274,44 @@ def new_arrival(state, future_event_list, current_time):
             })
 
     # Schedule the next arrival
-    interarrival_time = exponential(LAMBDA_VALUE)  # Assuming λ = 1/15
-    fel_maker(future_event_list, "new_arrival", current_time, interarrival_time, None)
+    interarrival_time = context.streams["arrivals"].exponential(LAMBDA_VALUE)  # Assuming λ = 1/15
+    fel_maker(future_event_list, EventType.NEW_ARRIVAL, current_time, interarrival_time, None)
 
 
-def lab_free(state, future_event_list, current_time, patient):  # patient is a model (an object) of models.Patient class
-    print(f"\nLab free function called at time {current_time}")
-    print(f"Current lab_list: {state['lab_list']}")
+def lab_free(context, current_time, patient):  # patient is a model (an object) of models.Patient class
+    state, future_event_list = context.state, context.future_event_list
+    trace = context.trace
+    if trace.level >= STATE:
+        trace.emit(current_time, "queue", queue="lab_list", patients=[p["patient_id"] for p in state['lab_list']])
 
     patient.lab_end_time = current_time
     if patient.is_elective:
         S = 2 * 24 * 60
-        fel_maker(future_event_list, "pre_surgery_done", current_time, S, patient=patient)
+        fel_maker(future_event_list, EventType.PRE_SURGERY_DONE, current_time, S, patient=patient)
     else:
-        S = triangular(5, 75, 100)
-        fel_maker(future_event_list, "emergency_done", current_time, S, patient=patient)
+        S = context.streams["er_stay"].triangular(5, 75, 100)
+        fel_maker(future_event_list, EventType.EMERGENCY_DONE, current_time, S, patient=patient)
 
     # Check if there are emergency patients in the lab queue
     if state["lab_list"]:
-        process_next_lab_patient(state, future_event_list, current_time, patients)
+        process_next_lab_patient(context, current_time)
     else:
         # No patients in the queues
         state["lab_patients"] -= 1
-        print(f"Lab free with no patients at {current_time}. Remaining lab patients: {state['lab_patients']}.")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "lab_idle", lab_patients=state['lab_patients'])
 
 
-def emergency_done(state, future_event_list, current_time, patient):
+def emergency_done(context, current_time, patient):
     """
     Handles the event of a patient completing their time in the emergency section.
     Args:
-        state (dict): Current state of the hospital.
-        future_event_list (list): Future event list.
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time.
         patient (Patient): The patient who is completing their emergency stay.
     """
-    print(f"\nEmergency done for patient {patient.id} at time {current_time}")
+    state, future_event_list, patients = context.state, context.future_event_list, context.patients
+    trace = context.trace
     patient.emergency_end_time = current_time
 
     # Check if there is space in the operating room
@@ -280,10 +321,11 @@ def emergency_done(state, future_event_list, current_time, patient):
         patient.surgery_entry_time = current_time
         patient.current_state = "surgery"
         state["emergency_patients"] -= 1
-        print(f"Patient {patient.id} moved to operating room from emergency at time {current_time}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "moved", patient=patient.id, source="emergency", section="operating_room")
 
         # Determine surgery type
-        r = random.random()
+        r = context.streams["surgery_type"].random()
         if r < 0.5:
             patient.operation_type = "simple"
         elif r < 0.95:
@@ -293,71 +335,68 @@ def emergency_done(state, future_event_list, current_time, patient):
 
         # Schedule surgery completion event based on operation type
         if patient.operation_type == "simple":
-            S = generate_simple_duration()  # Surgery time for simple operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["simple"](context.streams["surgery_duration"])  # Simple surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
         elif patient.operation_type == "medium":
-            S = generate_medium_duration()  # Surgery time for medium operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["medium"](context.streams["surgery_duration"])  # Medium surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
         elif patient.operation_type == "complex":
-            S = generate_complex_duration()  # Surgery time for complex operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["complex"](context.streams["surgery_duration"])  # Complex surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
 
     else:
         # If operating room is full, handle patient differently
-        print(f"Operating room is full. Patient {patient.id} added to queue wainting in emergency")
         state["surgery_list"].append({
             "time": current_time,
             "is_elective": patient.is_elective,
             "patient_id": patient.id
         })
 
-        state["surgery_list"].sort(key=lambda x: (x['is_elective'], x['time']))
-        print(f"surgery_list :  {len(state['surgery_list'])}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "queued", patient=patient.id, queue="surgery_list", source="emergency",
+                       length=len(state['surgery_list']))
 
     # ----------------------                     Look backward                     -----------------------
     # Check the emergency queue
-    print(state["emergency_queue"], f" : {state['emergency_list']}")
     if state["emergency_queue"] > 0 and state["emergency_patients"] < state["emergency_capacity"]:
         state["emergency_queue"] -= 1
         state["emergency_patients"] += 1
-        first_patient = state["emergency_list"].pop(0)
+        first_patient = state["emergency_list"].popleft()
         patient = patients[first_patient["patient_id"]]
         patient.emergency_entry_time = current_time
         patient.current_state = "emergency"
-        print(f"emergency queue updated. Remaining: {state['pre_surgery_queue']}")
-        print(f"Patient {patient.id} added to lab_list at time {current_time} and going to check lab if is empty")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "admitted", patient=patient.id, section="emergency",
+                       emergency_queue=state['emergency_queue'])
+            trace.emit(current_time, "queued", patient=patient.id, queue="lab_list")
         state["lab_list"].append({
             "time": current_time,
             "is_elective": False,
             "patient_id": patient.id
         })
-        state["lab_list"].sort(key=lambda x: (x['is_elective'], x['time']))
         if state["lab_patients"] < state["lab_capacity"]:
             if state["lab_list"]:
                 state["lab_patients"] += 1
                 # process patient
-                process_next_lab_patient(state, future_event_list, current_time, patients)
-            else:
-                # No patients in the lab queue
-                print(f"Lab free with no patients at {current_time}. Remaining lab patients: {state['lab_patients']}.")
-                print('')
+                process_next_lab_patient(context, current_time)
+
     # Update stats or logs if required
-    print(f"Updated state after emergency_done for patient {patient.id}:")
-    print(f"Emergency Patients: {state['emergency_patients']},"
-          f" Operating Room Patients: {state['operating_room_patients']}")
+    if trace.level >= STATE:
+        trace.emit(current_time, "state", emergency_patients=state['emergency_patients'],
+                   operating_room_patients=state['operating_room_patients'])
 
 
-def pre_surgery_done(state, future_event_list, current_time, patient):
+def pre_surgery_done(context, current_time, patient):
     """
     Handles the event of a patient completing their pre-surgery stay.
 
     Args:
-        state (dict): Current state of the hospital.
-        future_event_list (list): Future event list.
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time.
         patient (Patient): The patient completing their pre-surgery stay.
     """
-    print(f"\nPre-surgery done for patient {patient.id} at time {current_time}")
+    state, future_event_list, patients = context.state, context.future_event_list, context.patients
+    trace = context.trace
     patient.pre_surgery_end_time = current_time
 
     # Check if there is space in the operating room
@@ -366,10 +405,11 @@ def pre_surgery_done(state, future_event_list, current_time, patient):
         state["pre_surgery_patients"] -= 1
         patient.surgery_entry_time = current_time
         patient.current_state = "surgery"
-        print(f"Patient {patient.id} moved to operating room queue at time {current_time}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "moved", patient=patient.id, source="pre_surgery", section="operating_room")
 
         # Determine the type of surgery
-        r = random.random()
+        r = context.streams["surgery_type"].random()
         if r < 0.5:
             patient.operation_type = "simple"
         elif r < 0.95:
@@ -379,25 +419,25 @@ def pre_surgery_done(state, future_event_list, current_time, patient):
 
         # Schedule the surgery completion event based on operation type
         if patient.operation_type == "simple":
-            S = generate_simple_duration()  # Surgery time for simple operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["simple"](context.streams["surgery_duration"])  # Simple surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
         elif patient.operation_type == "medium":
-            S = generate_medium_duration()  # Surgery time for medium operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["medium"](context.streams["surgery_duration"])  # Medium surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
         elif patient.operation_type == "complex":
-            S = generate_complex_duration()  # Surgery time for complex operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["complex"](context.streams["surgery_duration"])  # Complex surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
 
     else:
         # Operating room is full  --- add to OR list
-        print(f"Operating room is full. Patient {patient.id} added to queue.")
         state["surgery_list"].append({
             "time": current_time,
             "patient_id": patient.id,
             "is_elective": patient.is_elective,
         })
-        state["surgery_list"].sort(key=lambda x: (x['is_elective'], x['time']))
-        print(f"surgery_list :  {len(state['surgery_list'])}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "queued", patient=patient.id, queue="surgery_list", source="pre_surgery",
+                       length=len(state['surgery_list']))
 
     # -------------------------------------  Backward  -----------------------------------
     # Manage pre-surgery queue
@@ -405,98 +445,89 @@ def pre_surgery_done(state, future_event_list, current_time, patient):
 
         state["pre_surgery_queue"] -= 1
         state["pre_surgery_patients"] += 1
-        first_patient = state["pre_surgery_list"].pop(0)
+        first_patient = state["pre_surgery_list"].popleft()
         patient = patients[first_patient["patient_id"]]
         patient.pre_surgery_entry_time = current_time
         patient.current_state = "pre_surgery"
-        print(f"Pre-surgery queue updated. Remaining: {state['pre_surgery_queue']}")
-
-        print(f"Patient {patient.id} added to lab_list at time {current_time}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "admitted", patient=patient.id, section="pre_surgery",
+                       pre_surgery_queue=state['pre_surgery_queue'])
+            trace.emit(current_time, "queued", patient=patient.id, queue="lab_list")
         state["lab_list"].append({
             "time": current_time,
             "is_elective": True,
             "patient_id": patient.id
         })
-        state["lab_list"].sort(key=lambda x: (x['is_elective'], x['time']))
         if state["lab_patients"] < state["lab_capacity"]:
             if state["lab_list"]:
                 state["lab_patients"] += 1
                 # process patient
-                process_next_lab_patient(state, future_event_list, current_time, patients)
-            else:
-                # No patients in the lab queue
-                print(f"Lab free with no patients at {current_time}. Remaining lab patients: {state['lab_patients']}.")
-                print('')
-        else:
-            pass
-    else:
-        print("No patients left in pre_surgery queue.")
+                process_next_lab_patient(context, current_time)
 
     # Update stats or logs
-
-    print(f"Updated state after patient {patient.id} entering the pre surgery section: ")
-    print(f"Operating Room Patients: {state['operating_room_patients']},"
-          f" Pre-Surgery Patients: {state['pre_surgery_patients']}")
+    if trace.level >= STATE:
+        trace.emit(current_time, "state", operating_room_patients=state['operating_room_patients'],
+                   pre_surgery_patients=state['pre_surgery_patients'])
 
 
-def surgery_free(state, future_event_list, current_time):
+def surgery_free(context, current_time, patient=None):
     """
     Handles the event when the operating room becomes ready.
 
     Args:
-        state (dict): Current state of the hospital.
-        future_event_list (list): Future event list.
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time.
     """
-    print(f"\nOperating room ready at time {current_time}")
-
+    state, future_event_list, patients = context.state, context.future_event_list, context.patients
+    trace = context.trace
     # Check if the operating room queue is empty
-    print("op patients", state["operating_room_patients"], "  -  op cap :", state["operating_room_capacity"])
     if len(state["surgery_list"]) > 0 and state["operating_room_patients"] < state["operating_room_capacity"]:
         # Get the first patient from the queue
-        first_patient = state["surgery_list"].pop(0)
+        first_patient = state["surgery_list"].popleft()
         patient_id = first_patient["patient_id"]
         patient = patients[patient_id]
 
         # Increment operating room count (O++)
         state["operating_room_patients"] += 1
         patient.surgery_entry_time = current_time
-        print(f"Patient {patient.id} moved to operating room at time {current_time}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "moved", patient=patient.id, source=patient.current_state,
+                       section="operating_room")
 
         # Where is the patient from
         if patient.current_state == "pre_surgery":
             state["pre_surgery_patients"] -= 1
             if len(state["pre_surgery_list"]) > 0:
                 state["pre_surgery_queue"] -= 1
-                pre_surgery_patient = state["pre_surgery_list"].pop(0)
+                pre_surgery_patient = state["pre_surgery_list"].popleft()
                 patient_id = pre_surgery_patient["patient_id"]
                 afterward_patient = patients[patient_id]
-                process_pre_surgery(state, future_event_list, current_time, afterward_patient)
+                process_pre_surgery(context, current_time, afterward_patient)
         elif patient.current_state == "emergency":
             state["emergency_patients"] -= 1
             if len(state["emergency_list"]) > 0:
                 state["emergency_queue"] -= 1
-                emergency_patient = state["emergency_list"].pop(0)
+                emergency_patient = state["emergency_list"].popleft()
                 patient_id = emergency_patient["patient_id"]
                 afterward_patient = patients[patient_id]
-                process_emergency(state, future_event_list, current_time, afterward_patient)
+                process_emergency(context, current_time, afterward_patient)
         elif patient.current_state == "icu":
             state["icu_patients"] -= 1
 
             if len(state["icu_list"]) > 0:
-                process_icu(state, future_event_list, current_time, patient)
+                process_icu(context, current_time, patient)
         elif patient.current_state == "ccu":
             state["ccu_patients"] -= 1
 
             if len(state["ccu_list"]) > 0:
-                ccu_patient = state["ccu_list"].pop(0)
+                ccu_patient = state["ccu_list"].popleft()
                 patient_id = ccu_patient["patient_id"]
                 afterward_patient = patients[patient_id]
-                process_ccu(state, future_event_list, current_time, afterward_patient)
+                process_ccu(context, current_time, afterward_patient)
 
         # Determine the type of surgery
         # assuming icu and ccu patients would have the same prob of determine op type
-        r = random.random()
+        r = context.streams["surgery_type"].random()
         if r < 0.5:
             patient.operation_type = "simple"
         elif r < 0.95:
@@ -506,37 +537,33 @@ def surgery_free(state, future_event_list, current_time):
 
         patient.current_state = "surgery"
         if patient.operation_type == "simple":
-            S = generate_simple_duration()  # Surgery time for simple operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["simple"](context.streams["surgery_duration"])  # Simple surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
         elif patient.operation_type == "medium":
-            S = generate_medium_duration()  # Surgery time for medium operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["medium"](context.streams["surgery_duration"])  # Medium surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
         elif patient.operation_type == "complex":
-            S = generate_complex_duration()  # Surgery time for complex operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
-
-    elective_count = sum(1 for p in state["surgery_list"] if p["is_elective"])
-    emergency_count = len(state["surgery_list"]) - elective_count
-    print(
-        f"Surgery List: {len(state['surgery_list'])} "
-        f"patients (Elective: {elective_count}, Emergency: {emergency_count})")
+            S = context.surgery_durations["complex"](context.streams["surgery_duration"])  # Complex surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
 
     # Log updated state
-    print(f"Updated state after operating_room_ready:")
-    print(f"Operating Room Patients: {state['operating_room_patients']}, Surgery Queue: {len(state['surgery_list'])}")
+    if trace.level >= STATE:
+        trace.emit(current_time, "state", operating_room_patients=state['operating_room_patients'],
+                   surgery_queue=len(state['surgery_list']), elective_waiting=state["surgery_list"].elective_count,
+                   emergency_waiting=state["surgery_list"].emergency_count)
 
 
-def surgery_done(state, future_event_list, current_time, patient):
+def surgery_done(context, current_time, patient):
     """
     Handles the event of a patient completing their surgery.
 
     Args:
-        state (dict): Current state of the hospital.
-        future_event_list (list): Future event list.
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time.
         patient (Patient): The patient completing their surgery.
     """
-    print(f"\nSurgery done for patient {patient.id} at time {current_time}")
+    state = context.state
+    trace = context.trace
     patient.surgery_end_time = current_time
 
     # Determine the destination based on the surgery type (operation type)
@@ -546,80 +573,69 @@ def surgery_done(state, future_event_list, current_time, patient):
             "patient_id": patient.id,
             "is_elective": patient.is_elective,
         })
-        state["ward_list"].sort(key=lambda x: x["time"])
-        process_ward(state, future_event_list, current_time, patient)
+        process_ward(context, current_time, patient)
 
     elif patient.operation_type == "medium":  # OT=2
-        r = random.random()
+        r = context.streams["routing"].random()
         if r < 0.7:
             state["ward_list"].append({
                 "time": current_time,
                 "patient_id": patient.id,
                 "is_elective": patient.is_elective,
             })
-            state["ward_list"].sort(key=lambda x: x["time"])
-            process_ward(state, future_event_list, current_time, patient)
+            process_ward(context, current_time, patient)
         elif r < 0.8:
             state["icu_list"].append({
                 "time": current_time,
                 "patient_id": patient.id,
                 "is_elective": patient.is_elective,
             })
-            state["icu_list"].sort(key=lambda x: x["time"])
-            process_icu(state, future_event_list, current_time, patient)
+            process_icu(context, current_time, patient)
         else:
             state["ccu_list"].append({
                 "time": current_time,
                 "patient_id": patient.id,
                 "is_elective": patient.is_elective,
             })
-            state["ccu_list"].sort(key=lambda x: x["time"])
-            process_ccu(state, future_event_list, current_time, patient)
+            process_ccu(context, current_time, patient)
 
     elif patient.operation_type == "complex":  # OT=3, 4
-        r = random.random()
+        r = context.streams["routing"].random()
         if r < 0.1:
             state["deceased_patients"] += 1
             state["operating_room_patients"] -= 1
         else:
-            r = random.random()
+            r = context.streams["routing"].random()
             if r < 0.75:  # not heart (OT = 3) icu
                 state["icu_list"].append({"time": current_time, "patient_id": patient.id,
                                           "is_elective": patient.is_elective})
-                state["icu_list"].sort(key=lambda x: x["time"])
-                process_icu(state, future_event_list, current_time, patient)
+                process_icu(context, current_time, patient)
             else:  # heart (OT = 4) ccu
                 state["ccu_list"].append({"time": current_time, "patient_id": patient.id,
                                           "is_elective": patient.is_elective})
-                state["ccu_list"].sort(key=lambda x: x["time"])
-                process_ccu(state, future_event_list, current_time, patient)
-
-    # Update statistics and schedule next events for operating room readiness
-    print(f"Operating room freed at time {current_time}.")
+                process_ccu(context, current_time, patient)
 
     # Log the updated state
-    print(f"Updated state after surgery_done for patient {patient.id}:")
-    print(f"Operating Room Patients: {state['operating_room_patients']}, "
-          f"Ward Patients: {(state['ward_patients'])}, "
-          f"ICU Patients: {state['icu_patients']}, "
-          f"CCU Patients: {state['ccu_patients']}, "
-          f"Deceased Patients: {state['deceased_patients']}")
+    if trace.level >= STATE:
+        trace.emit(current_time, "state", operating_room_patients=state['operating_room_patients'],
+                   ward_patients=state['ward_patients'], icu_patients=state['icu_patients'],
+                   ccu_patients=state['ccu_patients'], deceased_patients=state['deceased_patients'])
 
 
-def icu_done(state, future_event_list, current_time, patient):
+def icu_done(context, current_time, patient):
     """
     Handles the event of a patient completing their ICU stay.
 
     Args:
-        state (dict): Current state of the hospital.
-        future_event_list (list): Future event list.
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time.
         patient (Patient): The patient completing their ICU stay.
     """
-    print(f"\nICU Done event for patient {patient.id} at time {current_time}")
+    state, future_event_list = context.state, context.future_event_list
+    trace = context.trace
     patient.icu_end_time = current_time
 
-    r = random.random()
+    r = context.streams["routing"].random()
     if r < 0.01:
         patient.re_surgeries += 1
         if state["operating_room_patients"] < state["operating_room_capacity"]:
@@ -627,42 +643,43 @@ def icu_done(state, future_event_list, current_time, patient):
             state["icu_patients"] -= 1
             patient.surgery_entry_time = current_time
             patient.current_state = "surgery"
-            print(f"Patient {patient.id} moved to operating room from icu at time {current_time}")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "moved", patient=patient.id, source="icu", section="operating_room")
 
             # Determine the type of surgery -- hypothesis of that re-surgeries have complex surgery
             patient.operation_type = "complex"
             patient.is_elective = False
             # Schedule the surgery completion event based on operation type
-            S = generate_complex_duration()  # Surgery time for complex operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["complex"](context.streams["surgery_duration"])  # Complex surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
 
         else:
             # Operating room is full  --- add to OR list
-            print(f"Operating room is full. Patient {patient.id} added to queue standing in icu")
             state["surgery_list"].append({
                 "time": current_time,
                 "patient_id": patient.id,
                 "is_elective": False,
             })
-            state["surgery_list"].sort(key=lambda x: (x['is_elective'], x['time']))
-            print(f"surgery_list :  {len(state['surgery_list'])}")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "queued", patient=patient.id, queue="surgery_list", source="icu",
+                           length=len(state['surgery_list']))
     else:
         if state["ward_patients"] < state["ward_capacity"]:
-
-            print(f"Patient {patient.id} moved to ward from icu at time {current_time}.")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "moved", patient=patient.id, source="icu", section="ward")
             patient.ward_entry_time = current_time
             state["icu_patients"] -= 1
             state["ward_patients"] += 1
-            S = 60 * exponential(lambd=50)
-            fel_maker(future_event_list, "ward_done", current_time, S, patient)
+            S = 60 * context.streams["los"].exponential(50)
+            fel_maker(future_event_list, EventType.WARD_DONE, current_time, S, patient)
         else:
             state["ward_list"].append({
                 "time": current_time,
                 "patient_id": patient.id,
                 "is_elective": patient.is_elective,
             })
-            state["ward_list"].sort(key=lambda x: x["time"])
-            print(f"Patient {patient.id} added to ward queue (in icu) due to full ward capacity.")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "queued", patient=patient.id, queue="ward_list", source="icu")
 
     '''
     # Check if the patient is critical (acute case)
@@ -677,19 +694,19 @@ def icu_done(state, future_event_list, current_time, patient):
             print(f"Patient {patient.id} moved to operating room at time {current_time}.")
 
             # Determine surgery type (OT)
-            r = random.random()
+            r = context.streams["surgery_type"].random()
             if r < 0.5:
                 patient.operation_type = "simple"
-                S = generate_simple_duration()
-                fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+                S = context.surgery_durations["simple"](context.streams["surgery_duration"])
+                fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
             elif r < 0.85:
                 patient.operation_type = "medium"
-                S = generate_medium_duration()
-                fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+                S = context.surgery_durations["medium"](context.streams["surgery_duration"])
+                fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
             else:
                 patient.operation_type = "complex"
-                S = generate_complex_duration()
-                fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+                S = context.surgery_durations["complex"](context.streams["surgery_duration"])
+                fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
 
             print(f"Scheduled surgery for patient {patient.id} with operation type: {patient.operation_type}")
         else:
@@ -705,28 +722,29 @@ def icu_done(state, future_event_list, current_time, patient):
     # -------------------------------  backward look  -----------------------------
     # Handle ICU queue
     if len(state["icu_list"]) > 0:
-        process_icu(state, future_event_list, current_time, patient)
+        process_icu(context, current_time, patient)
 
     # Log updated state
-    print(f"Updated state after ICU Done event:")
-    print(f"ICU Patients: {state['icu_patients']}, Ward Patients: {state['ward_patients']}, "
-          f"Operating Room Patients: {state['operating_room_patients']}, Surgery Queue: {len(state['surgery_list'])}")
+    if trace.level >= STATE:
+        trace.emit(current_time, "state", icu_patients=state['icu_patients'], ward_patients=state['ward_patients'],
+                   operating_room_patients=state['operating_room_patients'],
+                   surgery_queue=len(state['surgery_list']))
 
 
-def ccu_done(state, future_event_list, current_time, patient):
+def ccu_done(context, current_time, patient):
     """
     Handles the event of a patient completing their CCU stay.
 
     Args:
-        state (dict): Current state of the hospital.
-        future_event_list (list): Future event list.
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time.
         patient (Patient): The patient completing their ICU stay.
     """
-    print(f"\nICU Done event for patient {patient.id} at time {current_time}")
+    state, future_event_list = context.state, context.future_event_list
+    trace = context.trace
     patient.ccu_end_time = current_time
 
-    r = random.random()
+    r = context.streams["routing"].random()
     if r < 0.01:
         patient.re_surgeries += 1
         if state["operating_room_patients"] < state["operating_room_capacity"]:
@@ -734,136 +752,140 @@ def ccu_done(state, future_event_list, current_time, patient):
             state["ccu_patients"] -= 1
             patient.surgery_entry_time = current_time
             patient.current_state = "surgery"
-            print(f"Patient {patient.id} moved to operating room from icu at time {current_time}")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "moved", patient=patient.id, source="ccu", section="operating_room")
 
             # Determine the type of surgery -- hypothesis of that re-surgeries have complex surgery
             patient.operation_type = "complex"
             patient.is_elective = False
             # Schedule the surgery completion event based on operation type
-            S = generate_complex_duration()  # Surgery time for complex operation
-            fel_maker(future_event_list, "surgery_done", current_time, S, patient)
+            S = context.surgery_durations["complex"](context.streams["surgery_duration"])  # Complex surgery time
+            fel_maker(future_event_list, EventType.SURGERY_DONE, current_time, S, patient)
 
         else:
             # Operating room is full  --- add to OR list
-            print(f"Operating room is full. Patient {patient.id} added to queue standing in ccu")
             state["surgery_list"].append({
                 "time": current_time,
                 "patient_id": patient.id,
                 "is_elective": False,
             })
-            state["surgery_list"].sort(key=lambda x: (x['is_elective'], x['time']))
-            print(f"surgery_list :  {len(state['surgery_list'])}")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "queued", patient=patient.id, queue="surgery_list", source="ccu",
+                           length=len(state['surgery_list']))
     else:
         if state["ward_patients"] < state["ward_capacity"]:
-
-            print(f"Patient {patient.id} moved to ward from ccu at time {current_time}.")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "moved", patient=patient.id, source="ccu", section="ward")
             patient.ward_entry_time = current_time
             state["ccu_patients"] -= 1
             state["ward_patients"] += 1
-            S = 60 * exponential(lambd=50)
-            fel_maker(future_event_list, "ward_done", current_time, S, patient)
+            S = 60 * context.streams["los"].exponential(50)
+            fel_maker(future_event_list, EventType.WARD_DONE, current_time, S, patient)
         else:
             state["ward_list"].append({
                 "time": current_time,
                 "patient_id": patient.id,
                 "is_elective": patient.is_elective,
             })
-            state["ward_list"].sort(key=lambda x: x["time"])
-            print(f"Patient {patient.id} added to ward queue (in icu) due to full ward capacity.")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "queued", patient=patient.id, queue="ward_list", source="ccu")
     # -------------------------------  backward look  -----------------------------
     # Handle CCU queue
     if len(state["ccu_list"]) > 0:
-        process_ccu(state, future_event_list, current_time, patient)
+        process_ccu(context, current_time, patient)
 
     # Log updated state
-    print(f"Updated state after CCU Done event:")
-    print(f"CCU Patients: {state['ccu_patients']}, Ward Patients: {state['ward_patients']}"
-          , f"Operating Room Patients: {state['operating_room_patients']}, Surgery Queue: {len(state['surgery_list'])}")
+    if trace.level >= STATE:
+        trace.emit(current_time, "state", ccu_patients=state['ccu_patients'], ward_patients=state['ward_patients'],
+                   operating_room_patients=state['operating_room_patients'],
+                   surgery_queue=len(state['surgery_list']))
 
 
-def ward_done(state, future_event_list, current_time, patient):
+def ward_done(context, current_time, patient):
+    state = context.state
     state['ward_patients'] -= 1
     state["finished_patients"] += 1
     patient.exit_time = current_time
     patient.current_state = "finished"
     if state["ward_list"]:
-        process_ward(state, future_event_list, current_time, patient)
+        process_ward(context, current_time, patient)
     else:
         pass
 
 
-def power_out(state, future_event_list, current_time):
-    print(f"\nPower outage occurred at time {current_time}")
+def power_out(context, current_time, patient=None):
+    state, future_event_list = context.state, context.future_event_list
     # Set power status to 0 (off)
     state["power_status"] = 0
-    state["icu_capacity"] = 8
-    state["ccu_capacity"] = 4
+    state.update(context.outage_capacities)
 
     S = 24 * 60
-    fel_maker(future_event_list, "power_restore", current_time, S, None)
+    fel_maker(future_event_list, EventType.POWER_RESTORE, current_time, S, None)
 
 
-def power_restore(state, future_event_list, current_time):
-    print(f"\nPower restored at time {current_time}")
+def power_restore(context, current_time, patient=None):
+    state = context.state
     # Set power status to 1 (on)
     state["power_status"] = 1
-    state["icu_capacity"] = 10
-    state["ccu_capacity"] = 5
+    for key in context.outage_capacities:
+        state[key] = context.capacities[key]
 
     # S = 24 * 60 * discrete_uniform(1, 30)
-    # fel_maker(future_event_list, "power_out", current_time, S, None)
+    # fel_maker(future_event_list, EventType.POWER_OUT, current_time, S, None)
 
 
 # ----------------------------------------------  help-functions  -----------------------------------------------
-def process_next_lab_patient(state, future_event_list, current_time, patients):
+def process_next_lab_patient(context, current_time):
     """
     Process the next patient from the lab queue and schedule their lab service.
 
     Args:
-        state (dict): Current state of the system
-        future_event_list (list): List of future events
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time
-        patients (dict) : list of patients with key patient_id
 
     Returns:
         bool: True if a patient was processed, False if lab queue was empty
     """
+    state, future_event_list, patients = context.state, context.future_event_list, context.patients
+    trace = context.trace
 
     # Check if there's an emergency patient in the queue
-    if any(not patient['is_elective'] for patient in state["lab_list"]):
+    if state["lab_list"].emergency_count:
         # Process emergency patient
-        first_patient = state["lab_list"].pop(0)
+        first_patient = state["lab_list"].popleft()
         patient = patients[first_patient["patient_id"]]
         patient.lab_entry_time = current_time
-        S = discrete_uniform(28, 32) + 10  # Lab service time for emergency
-        fel_maker(future_event_list, "lab_free", current_time, S, patient)
-        print(
-            f"Emergency patient {patient.id} handled"
-            f" in lab at {current_time}. Lab patients: {state['lab_patients']}.")
+        S = context.streams["lab_service"].discrete_uniform(28, 32) + 10  # Lab service time for emergency
+        fel_maker(future_event_list, EventType.LAB_FREE, current_time, S, patient)
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "moved", patient=patient.id, source="lab_list", section="lab",
+                       lab_patients=state['lab_patients'])
     else:
         # Process normal patient
-        first_patient = state["lab_list"].pop(0)
+        first_patient = state["lab_list"].popleft()
         patient = patients[first_patient["patient_id"]]
         patient.lab_entry_time = current_time
-        S = discrete_uniform(28, 32) + 60  # Lab service time for normal
-        fel_maker(future_event_list, "lab_free", current_time, S, patient)
-        print(f"Normal patient {patient.id} handled"
-              f" in lab at {current_time}. Lab patients: {state['lab_patients']}.")
+        S = context.streams["lab_service"].discrete_uniform(28, 32) + 60  # Lab service time for normal
+        fel_maker(future_event_list, EventType.LAB_FREE, current_time, S, patient)
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "moved", patient=patient.id, source="lab_list", section="lab",
+                       lab_patients=state['lab_patients'])
 
 
-def process_emergency(state, future_event_list, current_time, new_patient):
+def process_emergency(context, current_time, new_patient):
     """
     Process an emergency patient's admission or add to emergency queue.
 
     Args:
-        state (dict): Current state of the system
-        future_event_list (list): List of future events
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time
         new_patient (Patient): Emergency patient to be processed
 
     Returns:
         bool: True if patient was admitted to emergency, False if added to queue or rejected
     """
+    state, future_event_list = context.state, context.future_event_list
+    trace = context.trace
     patient_id = new_patient.id
 
     # Check if emergency section has capacity
@@ -873,26 +895,28 @@ def process_emergency(state, future_event_list, current_time, new_patient):
         new_patient.emergency_entry_time = current_time
         new_patient.current_state = 'emergency'
 
-        print(f"Patient {patient_id} admitted to emergency at {current_time}."
-              f" Current count: {state['emergency_patients']}/{state['emergency_capacity']}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "admitted", patient=patient_id, section="emergency",
+                       occupancy=state['emergency_patients'], capacity=state['emergency_capacity'])
 
         # Check lab availability
         if state["lab_patients"] < state["lab_capacity"]:
             # Lab is available
             state["lab_patients"] += 1
             new_patient.lab_entry_time = current_time
-            S = discrete_uniform(28, 32) + 10  # Shorter lab time for emergency
-            fel_maker(future_event_list, "lab_free", current_time, S, patient=new_patient)
-            print(f"Emergency patient {patient_id} directly admitted to lab")
+            S = context.streams["lab_service"].discrete_uniform(28, 32) + 10  # Shorter lab time for emergency
+            fel_maker(future_event_list, EventType.LAB_FREE, current_time, S, patient=new_patient)
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "moved", patient=patient_id, source="emergency", section="lab")
         else:
             # Add to lab queue with priority
-            print(f"Emergency patient {patient_id} added to lab_list at time {current_time}")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "queued", patient=patient_id, queue="lab_list")
             state["lab_list"].append({
                 "time": current_time,
                 "is_elective": False,  # Emergency patients get priority
                 "patient_id": patient_id
             })
-            state["lab_list"].sort(key=lambda x: (x['is_elective'], x['time']))
 
         return True
 
@@ -907,29 +931,33 @@ def process_emergency(state, future_event_list, current_time, new_patient):
                 "patient_id": patient_id
             })
             new_patient.current_state = "In Emergency Queue"
-            print(f"Emergency patient {patient_id} added to emergency queue. Queue size: {state['emergency_queue']}")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "queued", patient=patient_id, queue="emergency_list",
+                           length=state['emergency_queue'])
             return False
         else:
             # Emergency queue is full, patient is rejected
             state["rejected_patients"] += 1
             new_patient.current_state = "Rejected"
-            print(f"Emergency patient {patient_id} rejected due to full emergency queue")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "rejected", patient=patient_id)
             return False
 
 
-def process_pre_surgery(state, future_event_list, current_time, patient):
+def process_pre_surgery(context, current_time, patient):
     """
     Process a patient's admission to pre-surgery section or add to pre-surgery queue.
 
     Args:
-        state (dict): Current state of the system
-        future_event_list (list): List of future events
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time
         patient (Patient): Patient to be processed
 
     Returns:
         bool: True if patient was admitted to pre-surgery, False if added to queue
     """
+    state, future_event_list = context.state, context.future_event_list
+    trace = context.trace
     patient_id = patient.id
 
     if state["pre_surgery_patients"] < state["pre_surgery_capacity"]:
@@ -938,9 +966,9 @@ def process_pre_surgery(state, future_event_list, current_time, patient):
         patient.pre_surgery_entry_time = current_time
         patient.current_state = 'pre_surgery'
 
-        print(f"Patient {patient_id} state updated to {patient.current_state}")
-        print(f"Patient {patient_id} admitted to pre-surgery."
-              f" Current count: {state['pre_surgery_patients']}/{state['pre_surgery_capacity']}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "admitted", patient=patient_id, section="pre_surgery",
+                       occupancy=state['pre_surgery_patients'], capacity=state['pre_surgery_capacity'])
 
         # Check lab availability
         if state["lab_patients"] < state["lab_capacity"]:
@@ -948,20 +976,20 @@ def process_pre_surgery(state, future_event_list, current_time, patient):
             state["lab_patients"] += 1
             patient.lab_entry_time = current_time
             if patient.is_elective:
-                S = discrete_uniform(28, 32) + 60
+                S = context.streams["lab_service"].discrete_uniform(28, 32) + 60
             else:
-                S = discrete_uniform(28, 32) + 10
+                S = context.streams["lab_service"].discrete_uniform(28, 32) + 10
 
-            fel_maker(future_event_list, "lab_free", current_time, S, patient=patient)
+            fel_maker(future_event_list, EventType.LAB_FREE, current_time, S, patient=patient)
         else:
             # Add to lab queue
-            print(f"Patient {patient_id} added to lab_list at time {current_time}")
+            if trace.level >= DETAIL:
+                trace.emit(current_time, "queued", patient=patient_id, queue="lab_list")
             state["lab_list"].append({
                 "time": current_time,
                 "is_elective": patient.is_elective,
                 "patient_id": patient_id
             })
-            state["lab_list"].sort(key=lambda x: (x['is_elective'], x['time']))
 
         return True
 
@@ -973,27 +1001,30 @@ def process_pre_surgery(state, future_event_list, current_time, patient):
             "is_elective": True,
             "patient_id": patient_id
         })
-        print(f"Patient {patient_id} added to pre-surgery queue. Queue size: {state['pre_surgery_queue']}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "queued", patient=patient_id, queue="pre_surgery_list",
+                       length=state['pre_surgery_queue'])
 
         return False
 
 
-def process_ward(state, future_event_list, current_time, patient):
+def process_ward(context, current_time, patient):
     """
     Process a patient's transfer to the ward or ward queue.
 
     Args:
-        state (dict): Current state of the system
-        future_event_list (list): List of future events
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time
         patient (Patient): Patient to be processed
 
     Returns:
         bool: True if patient was transferred to ward, False if added to queue
     """
+    state, future_event_list, patients = context.state, context.future_event_list, context.patients
+    trace = context.trace
 
     if state["ward_patients"] < state["ward_capacity"] and len(state["ward_list"]) > 0:
-        processing_patient = state["ward_list"].pop(0)
+        processing_patient = state["ward_list"].popleft()
         processing_patient = patients[processing_patient["patient_id"]]
 
         # Patient goes to the ward
@@ -1009,15 +1040,16 @@ def process_ward(state, future_event_list, current_time, patient):
         state["ward_patients"] += 1
         processing_patient.ward_entry_time = current_time
 
-        print(f"Patient {processing_patient.id} moved to ward at time {current_time}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "moved", patient=processing_patient.id, section="ward")
 
         # Schedule ward completion
-        S = 60 * exponential(lambd=1 / 50)
-        fel_maker(future_event_list, "ward_done", current_time, S, processing_patient)
+        S = 60 * context.streams["los"].exponential(1 / 50)
+        fel_maker(future_event_list, EventType.WARD_DONE, current_time, S, processing_patient)
 
         # Schedule surgery room to be free
         S = 10
-        fel_maker(future_event_list, "surgery_free", current_time, S, processing_patient)
+        fel_maker(future_event_list, EventType.SURGERY_FREE, current_time, S, processing_patient)
         # Do not use this patient for free
 
     '''else:
@@ -1031,20 +1063,21 @@ def process_ward(state, future_event_list, current_time, patient):
         print(f"Patient {processing_patient.id} added to ward queue due to full capacity.")'''
 
 
-def process_icu(state, future_event_list, current_time, patient):
+def process_icu(context, current_time, patient):
     """
     Process a patient's transfer to the ICU or ICU queue.
 
     Args:
-        state (dict): Current state of the system
-        future_event_list (list): List of future events
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time
         patient (Patient): Patient to be processed
 
     Returns:
         bool: True if patient was transferred to ICU, False if added to queue
     """
-    processing_patient = state["icu_list"].pop(0)
+    state, future_event_list, patients = context.state, context.future_event_list, context.patients
+    trace = context.trace
+    processing_patient = state["icu_list"].popleft()
     processing_patient = patients[processing_patient["patient_id"]]
 
     if state["icu_patients"] < state["icu_capacity"]:
@@ -1054,15 +1087,16 @@ def process_icu(state, future_event_list, current_time, patient):
         processing_patient.current_state = "icu"
         processing_patient.icu_entry_time = current_time
 
-        print(f"Patient {processing_patient.id} moved to ICU at time {current_time}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "moved", patient=processing_patient.id, source="operating_room", section="icu")
 
         # Schedule ICU completion - using different lambda for ICU stay duration
-        S = 60 * exponential(lambd=1 / 25)  # Assuming average ICU-stay is 25 hours
-        fel_maker(future_event_list, "icu_done", current_time, S, processing_patient)
+        S = 60 * context.streams["los"].exponential(1 / 25)  # Assuming average ICU-stay is 25 hours
+        fel_maker(future_event_list, EventType.ICU_DONE, current_time, S, processing_patient)
 
         # Schedule surgery room to be free
         S = 10
-        fel_maker(future_event_list, "surgery_free", current_time, S,
+        fel_maker(future_event_list, EventType.SURGERY_FREE, current_time, S,
                   processing_patient)  # Do not use this patient surgery entry
 
         return True
@@ -1080,20 +1114,21 @@ def process_icu(state, future_event_list, current_time, patient):
         return False'''
 
 
-def process_ccu(state, future_event_list, current_time, patient):
+def process_ccu(context, current_time, patient):
     """
     Process a patient's transfer to the CCU or CCU queue.
 
     Args:
-        state (dict): Current state of the system
-        future_event_list (list): List of future events
+        context (SimulationContext): State, future event list, patients and RNG of the run.
         current_time (float): Current simulation time
         patient (Patient): Patient to be processed
 
     Returns:
         bool: True if patient was transferred to CCU, False if added to queue
     """
-    processing_patient = state["ccu_list"].pop(0)
+    state, future_event_list, patients = context.state, context.future_event_list, context.patients
+    trace = context.trace
+    processing_patient = state["ccu_list"].popleft()
     processing_patient = patients[processing_patient["patient_id"]]
 
     if state["ccu_patients"] < state["ccu_capacity"]:
@@ -1103,15 +1138,16 @@ def process_ccu(state, future_event_list, current_time, patient):
         processing_patient.current_state = "ccu"
         processing_patient.ccu_entry_time = current_time
 
-        print(f"Patient {processing_patient.id} moved to CCU at time {current_time}")
+        if trace.level >= DETAIL:
+            trace.emit(current_time, "moved", patient=processing_patient.id, source="operating_room", section="ccu")
 
         # Schedule CCU completion - using specific lambda for CCU stay duration
-        S = 60 * exponential(lambd=1 / 25)  # Assuming average CCU stay is 25 hours
-        fel_maker(future_event_list, "ccu_done", current_time, S, processing_patient)
+        S = 60 * context.streams["los"].exponential(1 / 25)  # Assuming average CCU stay is 25 hours
+        fel_maker(future_event_list, EventType.CCU_DONE, current_time, S, processing_patient)
 
         # Schedule surgery room to be free
         S = 10
-        fel_maker(future_event_list, "surgery_free", current_time, S,
+        fel_maker(future_event_list, EventType.SURGERY_FREE, current_time, S,
                   processing_patient)  # Do not use this patient for free
 
         return True
@@ -1127,3 +1163,18 @@ def process_ccu(state, future_event_list, current_time, patient):
         print(f"Patient {patient.id} added to CCU queue due to full capacity.")
 
         return False'''
+
+
+# ----------------------------------------------  event handlers  -----------------------------------------------
+# Routed by simulation() through events.EVENT_HANDLERS; new event types can be added with register_event_type
+register_event_type("new_arrival", new_arrival)
+register_event_type("lab_free", lab_free)
+register_event_type("emergency_done", emergency_done)
+register_event_type("pre_surgery_done", pre_surgery_done)
+register_event_type("surgery_done", surgery_done)
+register_event_type("surgery_free", surgery_free)
+register_event_type("icu_done", icu_done)
+register_event_type("ccu_done", ccu_done)
+register_event_type("ward_done", ward_done)
+register_event_type("power_out", power_out)
+register_event_type("power_restore", power_restore)
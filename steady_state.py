@@ -0,0 +1,147 @@
+"""
+Batch-means analysis of the steady state from a single long run.
+
+Instead of N replications that each pay for their own warm-up, one long run is
+split into consecutive batches after the warm-up period. Every batch gives one
+observation of each KPI; when the batches are long enough these observations
+are nearly independent, so the confidence intervals of replications.py apply
+to them. The lag-1 autocorrelation of the batch means is reported as a check.
+"""
+
+import math
+
+import numpy as np
+
+from context import SimulationContext
+from kpis import compute_patient_kpis, extract_patient_columns
+from online_stats import BatchStatisticsCollector, SECTION_OCCUPANCIES
+from replications import SECTIONS, print_results
+from simulation import simulation
+
+# Patient-based KPIs that have a batch mean (maxima and counts do not estimate a steady-state mean)
+PATIENT_KPIS = (['elective_mean_time', 'emergency_mean_time', 'avg_re_surgeries']
+                + [f'{section}_avg_wait' for section in SECTIONS])
+
+
+def lag1_autocorrelation(values):
+    """
+    Lag-1 sample autocorrelation of a series.
+    Returns:
+        float: nan for fewer than 3 values or a constant series.
+    """
+    x = np.asarray(values, dtype=float)
+    if len(x) < 3:
+        return float('nan')
+    deviations = x - x.mean()
+    denominator = deviations @ deviations
+    if denominator == 0:
+        return float('nan')
+    return (deviations[:-1] @ deviations[1:]) / denominator
+
+
+def batch_patient_masks(exit_times, boundaries):
+    """
+    Select the patients of every batch: the ones leaving the hospital in it.
+    Args:
+        exit_times (numpy.ndarray): Exit time of every patient (0 for patients still in the hospital).
+        boundaries (list): Batch boundaries, n_batches + 1 times.
+    Returns:
+        list: One boolean mask over the patients per batch; patients that never left are in none.
+    """
+    exited = exit_times != 0
+    return [exited & (exit_times >= begin) & (exit_times < end) for begin, end in zip(boundaries, boundaries[1:])]
+
+
+def batch_means(simulation_time, n_batches=20, warmup_time=0, seed=776):
+    """
+    Run one long simulation and compute the batch means of the KPIs.
+
+    The period after `warmup_time` is split into `n_batches` batches of equal length.
+    Time-weighted KPIs (queue lengths, emergency queue full probability, utilizations from the
+    occupancy counters) come from a BatchStatisticsCollector; patient-based KPIs are computed
+    with compute_patient_kpis over the patients leaving the hospital in each batch (nan for a
+    batch without any patient the KPI averages over).
+
+    Args:
+        simulation_time (float): Length of the run (minutes), warm-up included.
+        n_batches (int): Number of batches.
+        warmup_time (float): Initial period left out of every batch.
+        seed (int): Seed of the run.
+    Returns:
+        dict: KPI name -> list of batch means (one per batch), with the names used by
+            replications.replication_kpis, so it can be passed to replications.print_results.
+    """
+    batch_length = (simulation_time - warmup_time) / n_batches
+    collector = BatchStatisticsCollector(batch_length, n_batches, start=warmup_time)
+    context = SimulationContext(seed=seed, collector=collector)
+    _, patients, _ = simulation(simulation_time, log_mode='none', context=context)
+
+    metrics = {}
+    for section in SECTIONS:
+        metrics[f'{section}_avg_queue'] = collector.batch_averages(f'{section}_list')
+    metrics['emergency_queue_full_prob'] = collector.batch_fractions_at_capacity("emergency_queue")
+    for section, (occupancy, capacity_key) in SECTION_OCCUPANCIES.items():
+        capacity = context.capacities[capacity_key]
+        metrics[f'{section}_utilization'] = [average * 100 / capacity
+                                             for average in collector.batch_averages(occupancy)]
+
+    columns = extract_patient_columns(patients)
+    patient_metrics = {name: [] for name in PATIENT_KPIS}
+    for in_batch in batch_patient_masks(columns["exit_time"], collector.boundaries):
+        batch_kpis = compute_patient_kpis({name: column[in_batch] for name, column in columns.items()},
+                                          batch_length, empty_value=float('nan'))
+        for name in PATIENT_KPIS:
+            patient_metrics[name].append(batch_kpis[name])
+    for name in ('elective_mean_time', 'emergency_mean_time'):
+        patient_metrics[name] = [value / (60 * 24) for value in patient_metrics[name]]  # Convert to days
+    metrics.update(patient_metrics)
+    return metrics
+
+
+def check_batch_independence(metrics, z=1.96):
+    """
+    Lag-1 autocorrelation test of the batch means of every KPI.
+
+    Under independence the lag-1 autocorrelation of k batch means is about N(0, 1/k); KPIs beyond
+    z / sqrt(k) need longer (fewer) batches before their confidence interval can be trusted.
+    nan batches (no patients to average over) are left out first. A KPI with fewer than 3 batches
+    left, or a constant one, has no autocorrelation and is not testable.
+
+    Returns:
+        dict: KPI name -> (lag-1 autocorrelation, passed, number of nan batches left out); passed is
+            None when the KPI is not testable.
+    """
+    results = {}
+    for name, values in metrics.items():
+        values = np.asarray(values, dtype=float)
+        finite = values[~np.isnan(values)]
+        autocorrelation = lag1_autocorrelation(finite)
+        if math.isnan(autocorrelation):
+            passed = None
+        else:
+            passed = bool(abs(autocorrelation) <= z / math.sqrt(len(finite)))
+        results[name] = (autocorrelation, passed, len(values) - len(finite))
+    return results
+
+
+def print_independence_check(independence):
+    """Print the lag-1 autocorrelation of every KPI, flagging the ones that fail the test."""
+    print("\nLag-1 autocorrelation of the batch means:")
+    print("-" * 40)
+    for name, (autocorrelation, passed, dropped) in independence.items():
+        if passed is None:
+            flag = "  <- not testable (fewer than 3 non-nan batches or a constant KPI)"
+        elif not passed:
+            flag = "  <- correlated batches, use fewer (longer) batches"
+        else:
+            flag = ""
+        if dropped:
+            flag += f" ({dropped} nan batches left out)"
+        print(f"{name}: {autocorrelation:.4f}{flag}")
+
+
+if __name__ == "__main__":
+    # 100 days after a 30 day warm-up, in 10 batches of 10 days
+    metrics = batch_means(simulation_time=60 * 24 * (30 + 100), n_batches=10, warmup_time=60 * 24 * 30)
+    print_results(metrics, control_variates=False)
+    print_independence_check(check_batch_independence(metrics))
@@ -0,0 +1,42 @@
+import pytest
+
+from analysis import calculate_all_queue_stats, calculate_queue_length_stats, calculate_section_metrics
+from context import SimulationContext
+from online_stats import QUEUE_NAMES, StatisticsCollector
+from simulation import simulation
+
+SIMULATION_TIME = 60 * 24 * 2
+
+
+@pytest.fixture(scope='module')
+def run():
+    collector = StatisticsCollector()
+    context = SimulationContext(seed=9, collector=collector)
+    event_log, patients, _ = simulation(SIMULATION_TIME, log_mode='full', context=context)
+    return event_log, patients, collector
+
+
+def test_all_queue_stats_match_the_per_queue_scans(run):
+    event_log, _, collector = run
+    stats = calculate_all_queue_stats(event_log, SIMULATION_TIME)
+    for queue_name in QUEUE_NAMES:
+        average, maximum = calculate_queue_length_stats(event_log, SIMULATION_TIME, queue_name)
+        assert stats[queue_name] == (pytest.approx(average), maximum), queue_name
+    # The emergency queue is full at its capacity in the snapshot, as in the collector (power outages included)
+    assert stats["emergency_queue_full_probability"] == \
+        pytest.approx(collector.emergency_queue_full_probability(SIMULATION_TIME))
+
+
+def test_all_queue_stats_of_a_subset_and_of_an_empty_log(run):
+    event_log, _, _ = run
+    stats = calculate_all_queue_stats(event_log, SIMULATION_TIME, ['ward_list'])
+    assert set(stats) == {'ward_list', 'emergency_queue_full_probability'}
+    assert calculate_all_queue_stats(event_log[:1], SIMULATION_TIME, ['ward_list'])['ward_list'] == (0, 0)
+
+
+def test_section_metrics_from_the_log_and_from_the_collector_agree(run):
+    event_log, patients, collector = run
+    for section in ('lab', 'pre_surgery', 'surgery', 'icu', 'ward', 'ccu'):
+        from_log = calculate_section_metrics(event_log, SIMULATION_TIME, patients, section)
+        from_collector = calculate_section_metrics(event_log, SIMULATION_TIME, patients, section, collector=collector)
+        assert from_log[:2] == (pytest.approx(from_collector[0]), from_collector[1]), section
@@ -0,0 +1,74 @@
+import numpy as np
+
+from checkpoint import restore_checkpoint, warm_up
+from context import SimulationContext
+from kpis import extract_patient_columns
+from online_stats import StatisticsCollector
+from simulation import simulation
+from utils import NumpyVariates, set_seed
+
+WARMUP_TIME = 60 * 24
+SIMULATION_TIME = 60 * 24 * 3
+
+
+def _assert_same_run(context, expected):
+    assert context.time == expected.time
+    assert context.state == expected.state
+    columns, expected_columns = extract_patient_columns(context.patients), extract_patient_columns(expected.patients)
+    for name, column in expected_columns.items():
+        np.testing.assert_array_equal(columns[name], column, err_msg=name)
+
+
+def test_restored_run_continues_exactly_like_an_uninterrupted_one():
+    expected = SimulationContext(seed=21, substreams=True)
+    simulation(SIMULATION_TIME, log_mode='none', context=expected)
+
+    checkpoint = warm_up(WARMUP_TIME, seed=21, substreams=True)
+    context = restore_checkpoint(checkpoint)
+    assert context.time == WARMUP_TIME
+    simulation(SIMULATION_TIME, log_mode='none', context=context)
+    _assert_same_run(context, expected)
+
+
+def test_global_random_position_is_restored():
+    set_seed(22)
+    expected = SimulationContext()
+    simulation(SIMULATION_TIME, log_mode='none', context=expected)
+
+    set_seed(22)
+    checkpoint = warm_up(WARMUP_TIME)
+    set_seed(99)  # moved on in between
+    context = restore_checkpoint(checkpoint)
+    simulation(SIMULATION_TIME, log_mode='none', context=context)
+    _assert_same_run(context, expected)
+
+
+def test_reseeded_runs_share_the_warm_up_but_not_their_future():
+    checkpoint = warm_up(WARMUP_TIME, seed=23, substreams=True)
+    runs = []
+    for seed in (1, 1, 2):
+        context = restore_checkpoint(checkpoint, seed=seed)
+        simulation(SIMULATION_TIME, log_mode='none', context=context)
+        runs.append(sorted(patient.exit_time for patient in context.patients.values()))
+    assert runs[0] == runs[1] != runs[2]
+
+
+def test_restore_keeps_the_backend_of_the_checkpoint():
+    checkpoint = warm_up(WARMUP_TIME, seed=24, substreams=True, rng_backend='numpy')
+    context = restore_checkpoint(checkpoint, seed=5)
+    assert context.rng_backend == 'numpy'
+    assert all(isinstance(stream, NumpyVariates) for stream in context.streams.values())
+    assert restore_checkpoint(checkpoint, seed=5, rng_backend='python').rng_backend == 'python'
+
+
+def test_collector_of_a_restored_run_starts_at_the_checkpoint():
+    checkpoint = warm_up(WARMUP_TIME, seed=25, substreams=True)
+    collector = StatisticsCollector()
+    context = restore_checkpoint(checkpoint, collector=collector)
+    occupied = context.state['ward_patients']
+    assert occupied > 0
+    first_event_time = context.future_event_list.peek()[0]
+    simulation(first_event_time, log_mode='none', context=context, pause=True)
+    # Until the first restored event the ward keeps its warmed-up occupancy
+    area = collector.statistics['ward_patients'].totals(first_event_time, collector.step)[0]
+    assert area == occupied * (first_event_time - WARMUP_TIME)
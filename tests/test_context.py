@@ -0,0 +1,42 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from context import SimulationContext
+from simulation import simulation
+
+SIMULATION_TIME = 60 * 24 * 2
+
+
+def _summary(seed):
+    context = SimulationContext(seed=seed)
+    _, patients, _ = simulation(SIMULATION_TIME, log_mode='none', context=context)
+    return len(patients), context.time, sorted(patient.exit_time for patient in patients.values())
+
+
+def test_seeded_runs_are_independent_of_each_other_and_of_the_global_random():
+    expected = [_summary(seed) for seed in (10, 11, 12, 10)]
+    state = random.getstate()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(_summary, (10, 11, 12, 10))) == expected
+    assert random.getstate() == state
+    assert expected[0] == expected[3] != expected[1]
+
+
+def test_capacity_overrides():
+    context = SimulationContext(seed=1, capacities={'ward_capacity': 3})
+    simulation(SIMULATION_TIME, log_mode='none', context=context)
+    assert context.state['ward_capacity'] == 3
+    assert context.state['ward_patients'] <= 3
+
+
+@pytest.mark.parametrize('options, message', [
+    ({'capacities': {'ward_beds': 3}}, 'capacity'),
+    ({'patient_store': 'list'}, 'patient_store'),
+    ({'rng_backend': 'numba', 'seed': 1}, 'rng_backend'),
+    ({'rng': random, 'substreams': True}, 'substreams'),
+])
+def test_invalid_options_are_rejected(options, message):
+    with pytest.raises(ValueError, match=message):
+        SimulationContext(**options)
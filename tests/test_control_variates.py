@@ -0,0 +1,64 @@
+import math
+import pickle
+import random
+
+import numpy as np
+import pytest
+
+from checkpoint import restore_checkpoint, save_checkpoint
+from context import SimulationContext
+from control_variates import (CONTROLS, ControlRecorder, attach_control_recorders, control_values,
+                              control_variate_estimate)
+from simulation import simulation
+from utils import RandomVariates
+
+
+def test_control_variate_estimate_removes_the_control_noise():
+    rng = np.random.default_rng(20)
+    control = rng.normal(1.0, 0.1, 40)
+    data = 3.0 + 20 * (control - 1.0) + rng.normal(0, 0.05, 40)
+    estimate, standard_error = control_variate_estimate(data, {"control_arrivals": control})
+    plain_standard_error = np.std(data, ddof=1) / np.sqrt(40)
+    assert estimate == pytest.approx(3.0, abs=3 * standard_error)
+    assert standard_error < plain_standard_error / 10
+
+
+def test_control_variate_estimate_falls_back_to_the_sample_mean():
+    data = [1.0, 2.0, 4.0]
+    # A control that did not vary is dropped
+    estimate, standard_error = control_variate_estimate(data, {"control_los": [1.0, 1.0, 1.0]})
+    assert estimate == pytest.approx(np.mean(data))
+    assert standard_error == pytest.approx(np.std(data, ddof=1) / np.sqrt(3))
+    # Too few replications to fit the control (n - q - 1 < 1)
+    estimate, _ = control_variate_estimate(data[:2], {"control_arrivals": [0.9, 1.3]})
+    assert estimate == pytest.approx(1.5)
+
+
+def test_recorder_standardizes_its_draws():
+    recorder = ControlRecorder(RandomVariates(random.Random(20)))
+    assert math.isnan(recorder.mean())
+    values = [recorder.exponential(0.25) for _ in range(5000)]
+    assert recorder.count == 5000
+    assert recorder.mean() == pytest.approx(np.mean(values) * 0.25)
+    assert recorder.mean() == pytest.approx(1.0, abs=0.05)
+    assert 2 <= recorder.discrete_uniform(2, 5) <= 5  # other methods pass through
+    assert recorder.count == 5000
+
+
+def test_controls_of_a_run_are_near_their_known_means():
+    context = SimulationContext(seed=20)
+    recorders = attach_control_recorders(context)
+    assert all(context.streams[CONTROLS[name][0]] is recorder for name, recorder in recorders.items())
+    simulation(60 * 24 * 10, log_mode='none', context=context)
+    for name, value in control_values(recorders).items():
+        assert value == pytest.approx(CONTROLS[name][1], abs=0.25), name
+
+
+def test_contexts_with_recorders_can_be_checkpointed():
+    context = SimulationContext(seed=20)
+    attach_control_recorders(context)
+    simulation(60 * 24, log_mode='none', context=context)
+    restored = restore_checkpoint(save_checkpoint(context))
+    assert isinstance(restored.streams["arrivals"], ControlRecorder)
+    assert restored.streams["arrivals"].count == context.streams["arrivals"].count
+    assert pickle.loads(pickle.dumps(context.streams["los"])).total == context.streams["los"].total
@@ -0,0 +1,42 @@
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from context import SimulationContext
+from simulation import simulation
+
+# PH3-IND.py is a script with a dash in its name: load it by path
+_spec = importlib.util.spec_from_file_location(
+    'ph3_ind', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'PH3-IND.py'))
+ph3_ind = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ph3_ind)
+
+
+def test_paired_t_interval():
+    original, modified = [10.0, 12.0, 11.5, 13.0, 9.5], [8.0, 10.5, 10.0, 11.0, 8.5]
+    mean, (lower, upper) = ph3_ind.paired_t_interval(original, modified)
+    differences = np.subtract(original, modified)
+    margin = stats.t.ppf(0.975, df=4) * differences.std(ddof=1) / np.sqrt(5)
+    assert mean == pytest.approx(differences.mean())
+    assert (lower, upper) == (pytest.approx(mean - margin), pytest.approx(mean + margin))
+
+
+def _arrival_times(**options):
+    context = SimulationContext(seed=18, substreams=True, **options)
+    _, patients, _ = simulation(60 * 24 * 3, log_mode='none', context=context)
+    return [patient.arrival_time for patient in patients.values()]
+
+
+def test_both_systems_see_the_same_arrivals_with_common_random_numbers():
+    original = _arrival_times()
+    modified = _arrival_times(capacities=ph3_ind.MODIFIED_CAPACITIES,
+                              surgery_durations=ph3_ind.MODIFIED_SURGERY_DURATIONS)
+    assert len(original) > 100
+    assert modified == original
+
+
+def test_replications_of_the_same_seed_are_reproducible():
+    assert ph3_ind.run_replication(18, crn=True) == ph3_ind.run_replication(18, crn=True)
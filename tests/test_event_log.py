@@ -0,0 +1,39 @@
+import pytest
+
+from context import SimulationContext
+from simulation import simulation
+
+SIMULATION_TIME = 60 * 24 * 2
+
+
+def _run(log_mode):
+    event_log, _, _ = simulation(SIMULATION_TIME, log_mode=log_mode, context=SimulationContext(seed=5))
+    return event_log
+
+
+def _pending(event):
+    return [(pending['time'], pending['event_type'], pending['patient'] and pending['patient'].id)
+            for pending in event['future_event_list']]
+
+
+@pytest.fixture(scope='module')
+def logs():
+    return _run('full'), _run('delta')
+
+
+def test_delta_log_replays_every_full_log_entry(logs):
+    full_log, delta_log = logs
+    assert len(delta_log) == len(full_log) > 0
+    for full_event, delta_event in zip(full_log, delta_log):
+        assert delta_event['time'] == full_event['time']
+        assert delta_event['event_type'] == full_event['event_type']
+        assert full_event['state_snapshot'] == delta_event['state_snapshot']
+        assert _pending(delta_event) == _pending(full_event)
+
+
+def test_delta_log_random_access(logs):
+    full_log, delta_log = logs
+    for step in (len(full_log) - 1, 0, 250, 249, -1, 101):
+        assert full_log[step]['state_snapshot'] == delta_log.state_at(step)
+        assert _pending(delta_log[step]) == _pending(full_log[step])
+    assert [event['time'] for event in delta_log[10:20]] == [event['time'] for event in full_log[10:20]]
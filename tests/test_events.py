@@ -0,0 +1,36 @@
+import pytest
+
+from context import SimulationContext
+from events import EVENT_CODES, EVENT_HANDLERS, EVENT_NAMES, EventType, event_dict, register_event_type
+from simulation import simulation, starting_state
+
+
+def test_every_built_in_event_type_has_a_handler():
+    for event_type in EventType:
+        assert EVENT_NAMES[event_type] == event_type.name.lower()
+        assert EVENT_CODES[event_type.name.lower()] == event_type
+        assert callable(EVENT_HANDLERS[event_type])
+
+
+@pytest.fixture
+def registry():
+    names, handlers, codes = list(EVENT_NAMES), list(EVENT_HANDLERS), dict(EVENT_CODES)
+    yield
+    EVENT_NAMES[:], EVENT_HANDLERS[:] = names, handlers
+    EVENT_CODES.clear()
+    EVENT_CODES.update(codes)
+
+
+def test_registered_event_types_are_dispatched(registry):
+    calls = []
+    code = register_event_type('shift_change', lambda context, time, patient: calls.append((time, patient)))
+    assert code == len(EventType) and EVENT_NAMES[code] == 'shift_change'
+    assert register_event_type('shift_change', EVENT_HANDLERS[code]) == code  # re-registering keeps the code
+
+    context = SimulationContext(seed=14)
+    starting_state(context=context)
+    context.future_event_list.push(90.0, code)
+    simulation(60 * 3, log_mode='none', context=context)
+    assert calls == [(90.0, None)]
+    assert event_dict((90.0, 0, code, None), context.patients) == \
+        {'event_type': 'shift_change', 'time': 90.0, 'patient': None}
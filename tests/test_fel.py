@@ -0,0 +1,64 @@
+import random
+
+from context import SimulationContext
+from fel import CalendarQueue, FutureEventList
+from simulation import simulation
+from tracing import EVENTS, Tracer
+
+
+def test_events_come_out_in_time_order():
+    fel = FutureEventList()
+    rng = random.Random(1)
+    times = [rng.uniform(0, 100) for _ in range(200)]
+    for code, time in enumerate(times):
+        fel.push(time, code % 11, code)
+    popped = [fel.pop() for _ in range(len(fel))]
+    assert [entry[0] for entry in popped] == sorted(times)
+    assert not fel
+
+
+def test_events_at_the_same_time_keep_their_scheduling_order():
+    fel = FutureEventList()
+    for patient_id in range(5):
+        fel.push(10.0, 0, patient_id)
+    fel.push(5.0, 1)
+    assert fel.peek()[0] == 5.0
+    assert [fel.pop()[3] for _ in range(6)] == [None, 0, 1, 2, 3, 4]
+
+
+def test_sorted_entries_leave_the_list_unchanged():
+    fel = FutureEventList()
+    for time in (3.0, 1.0, 2.0):
+        fel.push(time, 0)
+    assert [entry[0] for entry in fel.sorted_entries()] == [1.0, 2.0, 3.0]
+    assert len(fel) == 3
+
+
+def test_calendar_queue_pops_in_the_heap_order():
+    rng = random.Random(2)
+    heap, calendar = FutureEventList(), CalendarQueue()
+    now = 0.0
+    for step in range(5000):
+        # Grow to a few hundred pending events, then drain (both resize directions of the calendar)
+        if step < 3000 and rng.random() < 0.6 or not heap:
+            time = now + rng.expovariate(0.1) if rng.random() < 0.9 else now  # include ties
+            heap.push(time, step % 11, step)
+            calendar.push(time, step % 11, step)
+        else:
+            assert calendar.peek() == heap.peek()
+            entry = heap.pop()
+            assert calendar.pop() == entry
+            now = entry[0]
+        assert len(calendar) == len(heap)
+
+
+def _event_sequence(fel_backend):
+    context = SimulationContext(seed=3, fel_backend=fel_backend, trace=Tracer(EVENTS))
+    simulation(60 * 24 * 2, log_mode='none', context=context)
+    return [(record['time'], record['event_type']) for record in context.trace.records if record['kind'] == 'event']
+
+
+def test_calendar_and_heap_runs_process_the_same_events():
+    events = _event_sequence('heap')
+    assert len(events) > 100
+    assert _event_sequence('calendar') == events
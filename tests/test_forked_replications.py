@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+import replications
+from context import SimulationContext
+from replications import run_forked_replications
+from simulation import simulation
+
+WARMUP_TIME = 60 * 24
+SIMULATION_TIME = 60 * 24 * 2
+
+
+def _assert_no_children_left():
+    with pytest.raises(ChildProcessError):
+        os.waitpid(-1, os.WNOHANG)
+
+
+def test_forked_replications_differ_by_seed():
+    metrics = run_forked_replications(3, warmup_time=WARMUP_TIME, simulation_time=SIMULATION_TIME, n_workers=2)
+    assert all(len(values) == 3 for values in metrics.values())
+    assert len(set(metrics['emergency_count'])) > 1
+    assert all(warmup_time == 1 for warmup_time in metrics['warmup_time'])
+    _assert_no_children_left()
+
+
+def test_a_child_dying_without_a_result_is_reported(monkeypatch):
+    forked_replication = replications._forked_replication
+
+    def dying_replication(context, seed, warmup_time, simulation_time, write_fd):
+        if seed == 776:
+            os._exit(3)  # as if killed before writing its result
+        forked_replication(context, seed, warmup_time, simulation_time, write_fd)
+
+    monkeypatch.setattr(replications, '_forked_replication', dying_replication)
+    with pytest.raises(RuntimeError, match="exit code 3"):
+        run_forked_replications(3, warmup_time=WARMUP_TIME, simulation_time=SIMULATION_TIME, n_workers=3)
+    _assert_no_children_left()
+
+
+def test_pause_stops_at_the_simulation_time():
+    context = SimulationContext(seed=25)
+    simulation(WARMUP_TIME, log_mode='none', context=context, pause=True)
+    assert context.time == WARMUP_TIME
+    assert context.future_event_list.peek()[0] > WARMUP_TIME
+    unpaused = SimulationContext(seed=25)
+    simulation(WARMUP_TIME, log_mode='none', context=unpaused)
+    assert unpaused.time > WARMUP_TIME  # processes the first event after simulation_time
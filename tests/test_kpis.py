@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+from analysis import (calculate_mean_time_in_system, calculate_waiting_times, calculate_pre_surgery_waiting_times,
+                      calculate_surgery_waiting_times, calculate_icu_waiting_times, calculate_ccu_waiting_times,
+                      calculate_ward_waiting_times, calculate_average_re_surgeries, calculate_re_surgeries,
+                      calculate_bed_utilization)
+from context import SimulationContext
+from kpis import SECTION_CAPACITIES, compute_patient_kpis
+from models import PatientStore
+from simulation import simulation
+
+SIMULATION_TIME = 60 * 24 * 5
+
+WAITING_TIME_FUNCTIONS = {
+    'lab': calculate_waiting_times,
+    'pre_surgery': calculate_pre_surgery_waiting_times,
+    'surgery': calculate_surgery_waiting_times,
+    'icu': calculate_icu_waiting_times,
+    'ward': calculate_ward_waiting_times,
+    'ccu': calculate_ccu_waiting_times,
+}
+
+
+@pytest.fixture(scope='module')
+def patients():
+    _, patients, _ = simulation(SIMULATION_TIME, log_mode='none', context=SimulationContext(seed=8))
+    return patients
+
+
+def test_patient_kpis_match_analysis(patients):
+    kpis = compute_patient_kpis(patients, SIMULATION_TIME)
+    elective_mean, elective_count, emergency_mean, emergency_count = calculate_mean_time_in_system(patients)
+    assert kpis['elective_mean_time'] == pytest.approx(elective_mean)
+    assert kpis['emergency_mean_time'] == pytest.approx(emergency_mean)
+    assert (kpis['elective_count'], kpis['emergency_count']) == (elective_count, emergency_count)
+    for section, waiting_time_function in WAITING_TIME_FUNCTIONS.items():
+        average, maximum = waiting_time_function(patients)
+        if isinstance(average, Exception):  # analysis returns the exception when nobody qualified
+            assert isinstance(kpis[f'{section}_avg_wait'], Exception)
+            continue
+        assert kpis[f'{section}_avg_wait'] == pytest.approx(average), section
+        assert kpis[f'{section}_max_wait'] == pytest.approx(maximum), section
+    assert kpis['avg_re_surgeries'] == pytest.approx(calculate_average_re_surgeries(patients))
+    assert kpis['total_re_surgeries'] == calculate_re_surgeries(patients)
+    for section, capacity in SECTION_CAPACITIES.items():
+        utilization = calculate_bed_utilization(patients, SIMULATION_TIME, capacity, section)
+        assert kpis[f'{section}_utilization'] == pytest.approx(utilization), section
+
+
+def test_patient_kpis_from_a_patient_store_match(patients):
+    store = PatientStore()
+    for patient_id, patient in patients.items():
+        view = store.create(patient_id, 0, patient.is_elective)
+        for name in ('arrival_time', 'exit_time', 'lab_entry_time', 'emergency_entry_time', 'pre_surgery_entry_time',
+                     'surgery_entry_time', 'icu_entry_time', 'ccu_entry_time', 'ward_entry_time',
+                     'emergency_end_time', 'pre_surgery_end_time', 'lab_end_time', 'surgery_end_time',
+                     'icu_end_time', 'ccu_end_time', 'ward_end_time', 'operation_type', 're_surgeries'):
+            setattr(view, name, getattr(patient, name))
+    expected, kpis = compute_patient_kpis(patients, SIMULATION_TIME), compute_patient_kpis(store, SIMULATION_TIME)
+    for name, value in expected.items():
+        if isinstance(value, Exception):
+            assert isinstance(kpis[name], Exception)
+        else:
+            assert kpis[name] == pytest.approx(value), name
+
+
+def test_empty_value_replaces_means_over_no_patients():
+    kpis = compute_patient_kpis({}, SIMULATION_TIME, empty_value=float('nan'))
+    assert math.isnan(kpis['elective_mean_time']) and math.isnan(kpis['ward_avg_wait'])
+    assert kpis['elective_count'] == 0
+    with pytest.raises(Exception, match="surgery"):
+        compute_patient_kpis({}, SIMULATION_TIME)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from context import SimulationContext
+from kpis import extract_patient_columns
+from simulation import simulation
+
+SIMULATION_TIME = 60 * 24 * 2
+
+
+def _run(log_mode):
+    context = SimulationContext(seed=4)
+    event_log, patients, _ = simulation(SIMULATION_TIME, log_mode=log_mode, context=context)
+    return event_log, patients, context
+
+
+def test_log_mode_none_runs_the_same_simulation_without_a_log():
+    full_log, full_patients, full_context = _run('full')
+    event_log, patients, context = _run('none')
+    assert event_log == []
+    assert len(full_log) > 0
+    assert context.time == full_context.time
+    assert context.state == full_log[-1]["state_snapshot"]
+    full_columns, columns = extract_patient_columns(full_patients), extract_patient_columns(patients)
+    assert full_columns.keys() == columns.keys()
+    for name in columns:
+        np.testing.assert_array_equal(columns[name], full_columns[name])
+
+
+def test_unknown_log_mode_is_rejected():
+    with pytest.raises(ValueError, match="log_mode"):
+        simulation(SIMULATION_TIME, log_mode='partial', context=SimulationContext(seed=4))
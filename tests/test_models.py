@@ -0,0 +1,53 @@
+import copy
+
+import numpy as np
+import pytest
+
+from context import SimulationContext
+from kpis import extract_patient_columns
+from models import Patient, PatientStore
+from simulation import simulation
+
+
+def test_patient_has_a_fixed_layout():
+    patient = Patient(7, 12.5, True)
+    assert not hasattr(patient, '__dict__')
+    with pytest.raises(AttributeError):
+        patient.unknown_field = 1
+    assert (patient.id, patient.is_elective, patient.current_state) == (7, True, "Arrived")
+    assert patient.exit_time == 0 and patient.re_surgeries == 0 and patient.operation_type is None
+
+
+def test_patient_copies_keep_every_field():
+    patient = Patient(3, 0, False)
+    patient.ward_entry_time = 42.0
+    patient.operation_type = "complex"
+    copied = copy.deepcopy(patient)
+    assert all(getattr(copied, name) == getattr(patient, name) for name in Patient.__slots__)
+
+
+def test_patient_store_views_read_and_write_their_row():
+    store = PatientStore(capacity=2)
+    for patient_id in range(1, 6):  # grows twice
+        store.create(patient_id, 0, patient_id % 2 == 0)
+    view = store[4]
+    view.lab_entry_time = 30.5
+    view.operation_type = "medium"
+    view.re_surgeries += 1
+    assert (view.id, view.is_elective, view.lab_entry_time, view.operation_type) == (4, True, 30.5, "medium")
+    assert store.column("lab_entry_time").tolist() == [0, 0, 0, 30.5, 0]
+    assert list(store.keys()) == [1, 2, 3, 4, 5] and 5 in store and 6 not in store
+    assert copy.deepcopy(view).re_surgeries == 1
+    with pytest.raises(ValueError, match="consecutive"):
+        store.create(8, 0, True)
+
+
+def test_columnar_and_dict_stores_record_the_same_run():
+    runs = {}
+    for patient_store in ('dict', 'columnar'):
+        context = SimulationContext(seed=7, patient_store=patient_store)
+        _, patients, _ = simulation(60 * 24 * 3, log_mode='none', context=context)
+        runs[patient_store] = extract_patient_columns(patients)
+    assert len(runs['dict']['exit_time']) > 0
+    for name, column in runs['dict'].items():
+        np.testing.assert_array_equal(runs['columnar'][name], column, err_msg=name)
@@ -0,0 +1,44 @@
+import pytest
+
+from analysis import calculate_queue_length_stats
+from context import SimulationContext
+from online_stats import QUEUE_NAMES, TRACKED_QUANTITIES, StatisticsCollector
+from simulation import simulation
+
+SIMULATION_TIME = 60 * 24 * 2
+
+
+@pytest.fixture(scope='module')
+def run():
+    collector = StatisticsCollector()
+    context = SimulationContext(seed=6, collector=collector)
+    event_log, _, _ = simulation(SIMULATION_TIME, log_mode='full', context=context)
+    return event_log, collector
+
+
+def _value(snapshot, name):
+    value = snapshot[name]
+    return value if isinstance(value, int) else len(value)
+
+
+def test_collector_matches_the_integrated_event_log(run):
+    event_log, collector = run
+    for name, capacity_key in TRACKED_QUANTITIES.items():
+        area = full_time = maximum = 0
+        for event, next_event in zip(event_log, event_log[1:]):
+            value = _value(event["state_snapshot"], name)
+            elapsed = next_event["time"] - event["time"]
+            area += value * elapsed
+            if capacity_key is not None and value >= event["state_snapshot"][capacity_key]:
+                full_time += elapsed
+            maximum = max(maximum, value)
+        assert collector.time_average(name, SIMULATION_TIME) == pytest.approx(area / SIMULATION_TIME), name
+        assert collector.time_at_capacity(name) == pytest.approx(full_time), name
+        assert collector.maximum(name) == maximum, name
+
+
+def test_collector_queue_stats_match_analysis(run):
+    event_log, collector = run
+    for queue_name in QUEUE_NAMES:
+        average, maximum = calculate_queue_length_stats(event_log, SIMULATION_TIME, queue_name)
+        assert collector.queue_length_stats(SIMULATION_TIME, queue_name) == (pytest.approx(average), maximum)
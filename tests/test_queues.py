@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from event_log import DeltaEventLog
+from fel import FutureEventList
+from queues import FifoQueue, TwoClassQueue
+
+ENTRY = {"time": 99.0, "is_elective": False, "patient_id": 99}
+
+
+def _entries(n, seed=15):
+    rng = random.Random(seed)
+    return [{"time": float(time), "is_elective": rng.random() < 0.5, "patient_id": time} for time in range(n)]
+
+
+def test_two_class_queue_serves_in_the_old_sorted_order():
+    entries = _entries(50)
+    queue = TwoClassQueue()
+    for entry in entries:
+        queue.append(entry)
+    expected = sorted(entries, key=lambda x: (x['is_elective'], x['time']))
+    assert queue == expected
+    assert queue.emergency_count == sum(not entry['is_elective'] for entry in entries)
+    assert queue.elective_count + queue.emergency_count == len(queue) == 50
+    assert [queue.popleft() for _ in range(50)] == expected
+    assert not queue
+    with pytest.raises(IndexError):
+        queue.popleft()
+
+
+def test_two_class_queue_counts_its_changes():
+    queue = TwoClassQueue(_entries(3))
+    assert queue.version == 3
+    queue.popleft()
+    assert queue.version == 4
+
+
+@pytest.mark.parametrize('mutate', [
+    lambda queue: queue.append(ENTRY),
+    lambda queue: queue.appendleft(ENTRY),
+    lambda queue: queue.popleft(),
+    lambda queue: queue.pop(),
+    lambda queue: queue.extend([ENTRY]),
+    lambda queue: queue.extendleft([ENTRY]),
+    lambda queue: queue.insert(1, ENTRY),
+    lambda queue: queue.remove(queue[0]),
+    lambda queue: queue.clear(),
+    lambda queue: queue.rotate(1),
+    lambda queue: queue.reverse(),
+    lambda queue: queue.__setitem__(0, ENTRY),
+    lambda queue: queue.__delitem__(0),
+    lambda queue: queue.__iadd__([ENTRY]),
+    lambda queue: queue.__imul__(2),
+])
+def test_fifo_queue_counts_every_change(mutate):
+    queue = FifoQueue(_entries(3))
+    version = queue.version
+    mutate(queue)
+    assert queue.version > version
+
+
+def test_delta_log_sees_changes_made_by_any_mutator():
+    future_event_list = FutureEventList()
+    future_event_list.journal = []
+    state = {"ward_list": FifoQueue(_entries(3)), "ward_patients": 0}
+    event_log = DeltaEventLog(patients={})
+    event_log.append(0.0, 0, None, state, future_event_list)
+    state["ward_list"].rotate(1)
+    event_log.append(1.0, 0, None, state, future_event_list)
+    state["ward_list"].pop()
+    event_log.append(2.0, 0, None, state, future_event_list)
+    entries = _entries(3)
+    assert event_log.state_at(1)["ward_list"] == [entries[2], entries[0], entries[1]]
+    assert event_log.state_at(2)["ward_list"] == [entries[2], entries[0]]
@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pytest
+
+from replications import relative_half_width, run_multiple_replications, run_to_precision
+
+SIMULATION_TIME = 60 * 24 * 2
+
+
+def _comparable(metrics):
+    # pre_surgery_avg_wait is an Exception object when nobody finished pre-surgery; compare those by repr
+    return {name: [repr(value) if isinstance(value, Exception) else value for value in values]
+            for name, values in metrics.items()}
+
+
+def test_pool_and_sequential_replications_agree():
+    sequential = run_multiple_replications(3, SIMULATION_TIME, n_workers=1)
+    pooled = run_multiple_replications(3, SIMULATION_TIME, n_workers=2)
+    assert all(len(values) == 3 for values in sequential.values())
+    assert _comparable(pooled) == _comparable(sequential)
+
+
+def test_replications_are_reproducible_and_differ_by_seed():
+    first = run_multiple_replications(2, SIMULATION_TIME)
+    assert _comparable(run_multiple_replications(2, SIMULATION_TIME)) == _comparable(first)
+    assert first['emergency_count'][0] != first['emergency_count'][1]
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")  # the sample variance of a single value
+def test_relative_half_width():
+    assert relative_half_width([1.0]) == math.inf
+    assert relative_half_width([0.0, 0.0, 0.0]) == 0.0
+    data = [9.0, 10.0, 11.0, 10.0]
+    assert relative_half_width(data) == pytest.approx(1.96 * np.std(data, ddof=1) / 2 / 10)
+
+
+def test_run_to_precision_stops_once_every_kpi_is_precise():
+    metrics, runs_needed = run_to_precision(['emergency_count'], relative_precision=0.5,
+                                            simulation_time=SIMULATION_TIME, min_replications=3)
+    assert runs_needed == {'emergency_count': 3}
+    # The first n runs are the ones run_multiple_replications(n) returns
+    assert _comparable(metrics) == _comparable(run_multiple_replications(3, SIMULATION_TIME))
+
+
+def test_run_to_precision_respects_its_budget():
+    metrics, runs_needed = run_to_precision(['emergency_count'], relative_precision=0.0001,
+                                            simulation_time=SIMULATION_TIME, batch_size=2, min_replications=2,
+                                            max_replications=5)
+    assert runs_needed == {'emergency_count': None}
+    assert len(metrics['emergency_count']) == 5
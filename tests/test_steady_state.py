@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from replications import print_results
+from steady_state import batch_patient_masks, batch_means, check_batch_independence, lag1_autocorrelation
+
+
+def test_patient_without_exit_is_in_no_batch():
+    exit_times = np.array([0.0, 5.0, 15.0, 0.0, 25.0])
+    masks = batch_patient_masks(exit_times, [0, 10, 20, 30])
+    assert [list(np.flatnonzero(mask)) for mask in masks] == [[1], [2], [4]]
+    assert not any(mask[[0, 3]].any() for mask in masks)
+
+
+def test_batch_means_has_one_value_per_batch():
+    metrics = batch_means(60 * 24 * 6, n_batches=3, warmup_time=60 * 24)
+    assert all(len(values) == 3 for values in metrics.values())
+    assert all(0 <= value <= 100 for value in metrics['ward_utilization'])
+
+
+def test_nan_batches_are_left_out_of_the_independence_check():
+    nan = float('nan')
+    results = check_batch_independence({
+        'empty': [nan] * 5,
+        'mostly_empty': [1.0, nan, 2.0, nan, nan],
+        'alternating': [1.0, nan, 3.0, 1.0, 3.0, 1.0, 3.0],
+        'independent': [1.0, 3.0, 2.0, 2.5, 1.5, 2.0],
+    })
+    assert results['empty'][1:] == (None, 5)
+    assert results['mostly_empty'][1:] == (None, 3)
+    autocorrelation, passed, dropped = results['alternating']
+    assert autocorrelation == pytest.approx(lag1_autocorrelation([1.0, 3.0, 1.0, 3.0, 1.0, 3.0]))
+    assert (passed, dropped) == (False, 1)
+    assert results['independent'][1:] == (True, 0)
+
+
+def test_print_results_leaves_out_nan_batches(capsys):
+    print_results({'elective_mean_time': [1.0, float('nan'), 3.0]}, control_variates=False)
+    output = capsys.readouterr().out
+    assert "Mean: 2.0000" in output
+    assert "Sample size: 2 (1 nan left out)" in output
+
+
+def test_lag1_autocorrelation():
+    assert lag1_autocorrelation([1.0, 2.0, 1.0, 2.0]) == pytest.approx(-0.75)
+    assert np.isnan(lag1_autocorrelation([1.0, 2.0]))
+    assert np.isnan(lag1_autocorrelation([3.0, 3.0, 3.0]))
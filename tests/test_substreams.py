@@ -0,0 +1,38 @@
+import pytest
+
+from context import STREAM_NAMES, SimulationContext
+from simulation import simulation
+
+
+@pytest.mark.parametrize('rng_backend', ['python', 'numpy'])
+def test_every_process_has_its_own_reproducible_stream(rng_backend):
+    context = SimulationContext(seed=17, substreams=True, rng_backend=rng_backend)
+    assert set(context.streams) == set(STREAM_NAMES)
+    assert len({id(stream) for stream in context.streams.values()}) == len(STREAM_NAMES)
+    again = SimulationContext(seed=17, substreams=True, rng_backend=rng_backend)
+    for name in STREAM_NAMES:
+        assert [context.streams[name].random() for _ in range(5)] == [again.streams[name].random() for _ in range(5)]
+
+
+@pytest.mark.parametrize('rng_backend', ['python', 'numpy'])
+def test_draws_from_one_stream_leave_the_others_unchanged(rng_backend):
+    plain = SimulationContext(seed=17, substreams=True, rng_backend=rng_backend)
+    changed = SimulationContext(seed=17, substreams=True, rng_backend=rng_backend)
+    for _ in range(100):
+        changed.streams['arrivals'].exponential(1.0)
+    for name in STREAM_NAMES[1:]:
+        assert [plain.streams[name].random() for _ in range(5)] == [changed.streams[name].random() for _ in range(5)]
+
+
+def test_without_substreams_every_process_shares_the_run_stream():
+    context = SimulationContext(seed=17)
+    assert all(stream is context.rng for stream in context.streams.values())
+
+
+def test_substream_runs_are_reproducible():
+    runs = []
+    for _ in range(2):
+        context = SimulationContext(seed=17, substreams=True)
+        _, patients, _ = simulation(60 * 24 * 2, log_mode='none', context=context)
+        runs.append((len(patients), context.time, sorted(patient.exit_time for patient in patients.values())))
+    assert runs[0] == runs[1]
@@ -0,0 +1,48 @@
+import io
+import json
+
+import pytest
+
+from context import SimulationContext
+from simulation import simulation
+from tracing import DETAIL, EVENTS, OFF, Tracer
+
+SIMULATION_TIME = 60 * 24
+
+
+def _trace(level, **options):
+    context = SimulationContext(seed=13, trace=Tracer(level, **options))
+    simulation(SIMULATION_TIME, log_mode='none', context=context)
+    return context.trace
+
+
+def test_a_run_is_silent_by_default(capsys):
+    assert _trace(OFF).records == []
+    assert capsys.readouterr().out == ""
+
+
+def test_events_level_records_every_event_and_a_summary():
+    records = _trace('events').records
+    kinds = {record['kind'] for record in records}
+    assert kinds == {'event', 'summary'}
+    assert records[-1]['kind'] == 'summary'
+    times = [record['time'] for record in records if record['kind'] == 'event']
+    assert times == sorted(times)
+
+
+def test_detail_level_adds_patient_movements():
+    kinds = {record['kind'] for record in _trace(DETAIL).records}
+    assert {'event', 'summary'} < kinds
+
+
+def test_records_go_to_the_sink_as_json_lines():
+    sink = io.StringIO()
+    trace = _trace(EVENTS, sink=sink, buffer_size=10)
+    assert trace.records == []
+    lines = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert lines[-1]['kind'] == 'summary' and len(lines) > 10
+
+
+def test_unknown_level_name_is_rejected():
+    with pytest.raises(ValueError, match="trace level"):
+        Tracer('verbose')
@@ -0,0 +1,74 @@
+import pickle
+import random
+
+import numpy as np
+import pytest
+
+from context import SimulationContext
+from replications import run_multiple_replications
+from simulation import simulation
+from utils import AntitheticVariates, NumpyVariates, RandomVariates, discrete_uniform
+
+N = 20000
+
+
+def test_numpy_variates_are_reproducible():
+    first, second = NumpyVariates(16, block_size=64), NumpyVariates(16, block_size=64)
+    draws = [(first.exponential(2.0), first.normal(5, 1), first.random()) for _ in range(300)]
+    assert draws == [(second.exponential(2.0), second.normal(5, 1), second.random()) for _ in range(300)]
+    other = NumpyVariates(17, block_size=64)
+    assert draws != [(other.exponential(2.0), other.normal(5, 1), other.random()) for _ in range(300)]
+
+
+def test_numpy_variates_have_the_right_distributions():
+    variates = NumpyVariates(16, block_size=1000)  # several refills
+    exponentials = np.array([variates.exponential(0.5) for _ in range(N)])
+    normals = np.array([variates.normal(74.54, 9.95) for _ in range(N)])
+    uniforms = np.array([variates.uniform(28, 32) for _ in range(N)])
+    integers = np.array([variates.discrete_uniform(2, 5) for _ in range(N)])
+    triangulars = np.array([variates.triangular(5, 75, 100) for _ in range(N)])
+    assert exponentials.mean() == pytest.approx(2.0, rel=0.05)
+    assert normals.mean() == pytest.approx(74.54, rel=0.01)
+    assert normals.std() == pytest.approx(9.95, rel=0.05)
+    assert 28 <= uniforms.min() and uniforms.max() <= 32
+    assert set(integers.tolist()) == {2, 3, 4, 5}
+    assert 5 <= triangulars.min() and triangulars.max() <= 100
+
+
+def test_runs_with_the_numpy_backend_are_reproducible():
+    runs = []
+    for _ in range(2):
+        context = SimulationContext(seed=16, rng_backend='numpy')
+        _, patients, _ = simulation(60 * 24 * 2, log_mode='none', context=context)
+        runs.append((len(patients), context.time, context.state['ward_patients']))
+    assert runs[0] == runs[1]
+
+
+def test_antithetic_variates_mirror_the_plain_run():
+    plain, twin = RandomVariates(random.Random(19)), AntitheticVariates(random.Random(19))
+    for _ in range(200):
+        assert twin.random() == pytest.approx(1 - plain.random())
+        assert twin.normal(242.03, 63.12) + plain.normal(242.03, 63.12) == pytest.approx(2 * 242.03)
+    exponentials = np.array([(plain.exponential(1.0), twin.exponential(1.0)) for _ in range(N)])
+    assert np.corrcoef(exponentials.T)[0, 1] < -0.5
+
+
+def test_antithetic_variates_pickle_with_their_position():
+    twin = AntitheticVariates(random.Random(19))
+    twin.normal(0, 1)
+    copy = pickle.loads(pickle.dumps(twin))
+    assert [copy.normal(0, 1) for _ in range(5)] == [twin.normal(0, 1) for _ in range(5)]
+
+
+def test_discrete_uniform_stays_in_range_for_a_uniform_of_one():
+    class One:
+        def random(self):
+            return 1.0
+    assert discrete_uniform(2, 5, One()) == 5
+
+
+def test_antithetic_replications_run_in_pairs():
+    with pytest.raises(ValueError, match="pairs"):
+        run_multiple_replications(3, 60 * 24, antithetic=True)
+    metrics = run_multiple_replications(4, 60 * 24, antithetic=True)
+    assert all(len(values) == 2 for values in metrics.values())
@@ -0,0 +1,40 @@
+import numpy as np
+
+from context import SimulationContext
+from online_stats import TRACKED_QUANTITIES, WarmupStatisticsCollector, mser_truncation
+from simulation import simulation
+
+
+def test_mser_finds_a_known_transient():
+    rng = np.random.default_rng(1)
+    transient = np.linspace(20, 0, 100, endpoint=False)
+    values = np.concatenate([transient, np.zeros(900)]) + rng.normal(0, 1, 1000)
+    point = mser_truncation(list(values))
+    assert point % 5 == 0
+    assert 50 <= point <= 150
+
+
+def test_mser_keeps_a_stationary_series():
+    values = np.random.default_rng(2).normal(5, 1, 500)
+    assert mser_truncation(list(values)) < 125
+
+
+def test_mser_reports_a_drifting_series_as_not_settled():
+    values = np.arange(500, dtype=float) + np.random.default_rng(3).normal(0, 1, 500)
+    assert mser_truncation(list(values)) is None
+
+
+def test_mser_on_a_few_batches():
+    assert mser_truncation([1.0] * 4) == 0  # less than two batches
+    assert mser_truncation([5.0] * 5 + [1.0, 1.1, 0.9, 1.0, 1.0] * 5) == 5
+
+
+def test_truncation_time_is_a_bin_boundary_in_the_first_half():
+    collector = WarmupStatisticsCollector()
+    simulation(60 * 24 * 10, log_mode='none', context=SimulationContext(seed=776, collector=collector))
+    truncation_time = collector.truncation_time()
+    assert truncation_time % collector.bin_width == 0
+    assert 0 <= truncation_time <= 60 * 24 * 5
+    points = collector.truncation_points()
+    assert set(points) == set(TRACKED_QUANTITIES)
+    assert all(point is None or point % collector.bin_width == 0 for point in points.values())
@@ -25,26 +25,29 @@ def set_seed(seed_value):
     np.random.seed(seed_value)
 
 
-def exponential(lambd):
+# The samplers draw their uniforms from `rng` (anything with a random() method); by default the
+# global random module seeded by set_seed. The simulation itself draws through a variate source
+# (RandomVariates or NumpyVariates below), whose methods have the same names.
+def exponential(lambd, rng=random):
     """Generate a random number from an exponential distribution."""
-    r = random.random()
+    r = rng.random()
     return -(1 / lambd) * math.log(r)
 
 
-def discrete_uniform(a, b):
-    r = random.random()
-    return a + int(r * (b - a + 1))
+def discrete_uniform(a, b, rng=random):
+    r = rng.random()
+    return min(a + int(r * (b - a + 1)), b)  # r == 1.0 (an antithetic 1 - U with U == 0) would give b + 1
 
 
-def uniform(a, b):
+def uniform(a, b, rng=random):
     """Generate a random number from a uniform distribution."""
-    r = random.random()
+    r = rng.random()
     return a + (b - a) * r
 
 
-def triangular(minimum, mean, maximum):
+def triangular(minimum, mean, maximum, rng=random):
     """Generate a random number from a triangular distribution."""
-    r = random.random()
+    r = rng.random()
     F_c = (maximum - minimum) / (mean - minimum)
     if r <= F_c:
         return minimum + math.sqrt(r * (mean - minimum) * (maximum - minimum))
@@ -52,24 +55,150 @@ def triangular(minimum, mean, maximum):
         return mean - math.sqrt((1 - r) * (mean - minimum) * (mean - maximum))
 
 
-def generate_normal(mean, std_dev):
-    r1 = random.random()
-    r2 = random.random()
+def generate_normal(mean, std_dev, rng=random):
+    r1 = rng.random()
+    r2 = rng.random()
     z0 = math.sqrt(-2 * math.log(r1)) * math.cos(2 * math.pi * r2)
     num = mean + z0 * std_dev
     return num
 
 
-def generate_simple_duration():
-    return generate_normal(mean=30.22, std_dev=4.96)
+def generate_simple_duration(rng=None):
+    return (rng or DEFAULT_VARIATES).normal(mean=30.22, std_dev=4.96)
 
 
-def generate_medium_duration():
-    return generate_normal(mean=74.54, std_dev=9.95)
+def generate_medium_duration(rng=None):
+    return (rng or DEFAULT_VARIATES).normal(mean=74.54, std_dev=9.95)
 
 
-def generate_complex_duration():
-    return generate_normal(mean=242.03, std_dev=63.12)
+def generate_complex_duration(rng=None):
+    return (rng or DEFAULT_VARIATES).normal(mean=242.03, std_dev=63.12)
+
+
+class RandomVariates:
+    """
+    Variate source built on a uniform source with a random() method (the random module or a
+    random.Random). Its methods are the samplers above, so seeded runs give the original numbers.
+    """
+
+    def __init__(self, source=random):
+        self.source = source
+        self.random = source.random
+
+    def __reduce__(self):
+        # The global random module cannot be pickled: DEFAULT_VARIATES is pickled by name (its
+        # position is random.getstate(), see checkpoint.py)
+        if self.source is random:
+            return 'DEFAULT_VARIATES'
+        return RandomVariates, (self.source,)
+
+    def exponential(self, lambd):
+        return exponential(lambd, self.source)
+
+    def discrete_uniform(self, a, b):
+        return discrete_uniform(a, b, self.source)
+
+    def uniform(self, a, b):
+        return uniform(a, b, self.source)
+
+    def triangular(self, minimum, mean, maximum):
+        return triangular(minimum, mean, maximum, self.source)
+
+    def normal(self, mean, std_dev):
+        return generate_normal(mean, std_dev, self.source)
+
+
+class AntitheticUniforms:
+    """Uniform source returning 1 - U for every uniform U of `source`."""
+
+    def __init__(self, source=random):
+        self.source = source
+
+    def random(self):
+        return 1.0 - self.source.random()
+
+
+class AntitheticVariates(RandomVariates):
+    """
+    Antithetic twin of RandomVariates(source): the samplers use 1 - U for every uniform U of the plain
+    run, and normals are reflected around their mean (mean - z * std_dev for the plain run's z).
+
+    Box-Muller on 1 - U would not be antithetic (cos(2 pi (1 - U)) == cos(2 pi U), and the radius is
+    not negative), so normal() draws the plain run's uniforms and negates the result instead. Both
+    runs consume the same uniforms, so they stay synchronized.
+    """
+
+    def __init__(self, source=random):
+        super().__init__(AntitheticUniforms(source))
+        self.plain_source = source
+
+    def __reduce__(self):
+        return AntitheticVariates, (self.plain_source,)
+
+    def normal(self, mean, std_dev):
+        return 2 * mean - generate_normal(mean, std_dev, self.plain_source)
+
+
+class _BlockStream:
+    """Serves the values of blocks drawn with draw(block_size) one at a time."""
+
+    __slots__ = ('_draw', '_block_size', '_values')
+
+    def __init__(self, draw, block_size):
+        self._draw = draw
+        self._block_size = block_size
+        self._values = iter(())
+
+    def __call__(self):
+        try:
+            return next(self._values)
+        except StopIteration:
+            # tolist() turns the block into Python floats, which are much faster to serve than NumPy scalars
+            self._values = iter(self._draw(self._block_size).tolist())
+            return next(self._values)
+
+
+class NumpyVariates:
+    """
+    Variate source drawing from a numpy.random.Generator in blocks.
+
+    Uniforms, standard exponentials and standard normals each have their own stream, refilled
+    `block_size` values at a time and served one by one; the samplers only scale and shift them.
+    Normals come from the Generator's standard_normal, so no Box-Muller value is discarded.
+    The same seed always gives the same variates (but not the numbers of RandomVariates).
+    """
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, seed=None, block_size=BLOCK_SIZE, generator=None):
+        """
+        Args:
+            seed: Seed (int or numpy.random.SeedSequence) of a new PCG64 Generator.
+            block_size (int): Number of variates drawn per refill of a stream.
+            generator (numpy.random.Generator): Existing generator to draw from (overrides `seed`).
+        """
+        self.generator = generator if generator is not None else np.random.default_rng(seed)
+        self.random = _BlockStream(self.generator.random, block_size)
+        self._standard_exponential = _BlockStream(self.generator.standard_exponential, block_size)
+        self._standard_normal = _BlockStream(self.generator.standard_normal, block_size)
+
+    def exponential(self, lambd):
+        return self._standard_exponential() / lambd
+
+    def discrete_uniform(self, a, b):
+        return a + int(self.random() * (b - a + 1))
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def triangular(self, minimum, mean, maximum):
+        return triangular(minimum, mean, maximum, self)
+
+    def normal(self, mean, std_dev):
+        return mean + self._standard_normal() * std_dev
+
+
+DEFAULT_VARIATES = RandomVariates(random)  # the global random module, seeded by set_seed
 
 
 def nice_print(current_state, current_event):